@@ -1,6 +1,8 @@
 import resend
 import os
 
+from Auth_Backend.cassette import get_cassette, request_key
+
 # Resend API Key (set in Render ENV)
 resend.api_key = os.getenv("RESEND_API_KEY")
 
@@ -54,7 +56,7 @@ def send_magic_link(email: str, link: str, purpose: str):
     </div>
     """
 
-    resend.Emails.send({
+    params = {
         "from": FROM_EMAIL,
         "to": email,
         "subject": subject,
@@ -63,4 +65,12 @@ def send_magic_link(email: str, link: str, purpose: str):
         "click_tracking": False,
         "open_tracking": False
 
-    })
\ No newline at end of file
+    }
+
+    # With CASSETTE_MODE set, sends are recorded or replayed (the link's token
+    # changes every time, so the key is only recipient and purpose)
+    cassette = get_cassette()
+    if cassette is None:
+        return resend.Emails.send(params)
+    request = {"to": email, "purpose": purpose, "subject": subject}
+    return cassette.call("resend", request_key(email, purpose), request, lambda: resend.Emails.send(params))
\ No newline at end of file
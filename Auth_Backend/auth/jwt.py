@@ -6,6 +6,8 @@ from fastapi import HTTPException
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 SESSION_EXP_HOURS = 2
+# Magic-link tokens are signed with the same key; only this purpose is a session
+SESSION_PURPOSE = "session"
 
 if not SECRET_KEY:
     raise RuntimeError("SECRET_KEY environment variable not set")
@@ -14,6 +16,7 @@ if not SECRET_KEY:
 def create_jwt(email: str) -> str:
     payload = {
         "sub": email,
+        "purpose": SESSION_PURPOSE,
         "iat": datetime.utcnow(),
         "exp": datetime.utcnow() + timedelta(hours=SESSION_EXP_HOURS)
     }
@@ -22,6 +25,11 @@ def create_jwt(email: str) -> str:
 
 def verify_jwt(token: str) -> dict:
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid session token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid session token")
+
+    if payload.get("purpose") != SESSION_PURPOSE:
+        raise HTTPException(status_code=401, detail="Invalid session token")
+
+    return payload
\ No newline at end of file
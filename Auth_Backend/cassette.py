@@ -0,0 +1,260 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# --------------------------------------------------
+# CASSETTE CONFIG
+# --------------------------------------------------
+# "off" (default), "record" (call through and save every exchange) or
+# "replay" (answer from the cassette, never touching the network)
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+# One JSON object per line; a .gz suffix compresses the file (one gzip
+# member per line, so a crash loses at most the exchange being written)
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", "./cassette.jsonl.gz")
+# Replay timing: 1 = original latencies, 10 = ten times faster, 0 = instant
+CASSETTE_SPEED = float(os.getenv("CASSETTE_SPEED", "1"))
+
+
+class CassetteMiss(LookupError):
+    """Replay found no (remaining) recording for a request"""
+
+
+class RecordedError(Exception):
+    """A failure captured while recording, raised again on replay"""
+
+    def __init__(self, message: str, error_type: str = "Exception", status: int = None):
+        super().__init__(message)
+        self.error_type = error_type
+        self.status = status
+
+
+def request_key(*parts) -> str:
+    """Stable key for a request: only the parts that decide the response"""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def error_record(error: Exception) -> dict:
+    return {
+        "type": getattr(error, "error_type", None) or type(error).__name__,
+        "message": str(error),
+        "status": getattr(error, "status", None)
+    }
+
+
+def _read_entries(path: str) -> list:
+    """Every complete recording in a cassette, ignoring a tail cut off by a crash"""
+    entries = []
+    opener = gzip.open if path.endswith(".gz") else open
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+    except (EOFError, gzip.BadGzipFile, json.JSONDecodeError) as e:
+        print(f"⚠️ Cassette {path} ends early ({type(e).__name__}), using {len(entries)} recordings")
+    return entries
+
+
+# --------------------------------------------------
+# CASSETTE
+# --------------------------------------------------
+class Cassette:
+    """
+    Compact on-disk log of outbound calls (Bedrock, Resend) with their timing.
+
+    Each line holds service, key, request, response or error, the call's
+    start offset "t" and its "duration" in seconds, plus per-chunk delays for
+    streams. Replay hands back recordings for the same key in recorded order
+    and sleeps the original durations divided by speed.
+    """
+
+    def __init__(self, path: str = CASSETTE_PATH, mode: str = "replay", speed: float = CASSETTE_SPEED):
+        if mode not in ("record", "replay"):
+            raise ValueError("Cassette mode must be 'record' or 'replay'")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+        self._entries = []
+        self._unplayed = defaultdict(deque)
+        self._file = None
+
+        if mode == "replay":
+            self._entries = _read_entries(path)
+            for entry in self._entries:
+                self._unplayed[(entry["service"], entry["key"])].append(entry)
+
+    # ---------- recording ----------
+    def record(self, service: str, key: str, request: dict, started: float, duration: float,
+               response=None, error: dict = None, chunks: list = None, op: str = "call"):
+        """Append one exchange; started is a time.monotonic() reading"""
+        entry = {
+            "service": service,
+            "op": op,
+            "key": key,
+            "t": round(started - self._origin, 4),
+            "duration": round(duration, 4),
+            "request": request,
+            "response": response,
+            "error": error
+        }
+        if chunks is not None:
+            entry["chunks"] = chunks
+        data = (json.dumps(entry, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+        if self.path.endswith(".gz"):
+            # A complete gzip member per exchange: readable even if the process never closes the file
+            data = gzip.compress(data)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(data)
+            self._file.flush()
+            self._entries.append(entry)
+
+    # ---------- replay ----------
+    def lookup(self, service: str, key: str) -> dict:
+        """Next unplayed recording for key; the last one repeats once they run out"""
+        with self._lock:
+            queue = self._unplayed.get((service, key))
+            if not queue:
+                raise CassetteMiss(f"No {service} recording for request {key}")
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def wait(self, seconds: float):
+        """Sleep a recorded delay, compressed by speed"""
+        if self.speed > 0 and seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    @staticmethod
+    def recorded_error(error: dict, make_error=None) -> Exception:
+        """The exception to raise for a recorded failure (RecordedError unless make_error builds one)"""
+        if make_error is not None:
+            return make_error(error)
+        return RecordedError(error["message"], error["type"], error.get("status"))
+
+    # ---------- record or replay ----------
+    def call(self, service: str, key: str, request: dict, fn, op: str = "call", make_error=None,
+             record_errors=Exception):
+        """
+        Record or replay one request/response exchange; fn's result must be
+        JSON-serializable. Failures of the record_errors types are recorded
+        and raised again on replay (see recorded_error).
+        """
+        if self.mode == "replay":
+            entry = self.lookup(service, key)
+            self.wait(entry["duration"])
+            if entry.get("error"):
+                raise self.recorded_error(entry["error"], make_error)
+            return entry["response"]
+
+        started = time.monotonic()
+        try:
+            response = fn()
+        except record_errors as e:
+            self.record(service, key, request, started, time.monotonic() - started, error=error_record(e), op=op)
+            raise
+        self.record(service, key, request, started, time.monotonic() - started, response=response, op=op)
+        return response
+
+    def stream(self, service: str, key: str, request: dict, fn, meta: dict, op: str = "stream", make_error=None,
+               record_errors=Exception):
+        """
+        Record or replay a streamed exchange, keeping each chunk's delay.
+        fn() yields the chunks and fills meta (e.g. stop reason and usage),
+        which is saved as the response and restored into meta on replay.
+        """
+        if self.mode == "replay":
+            entry = self.lookup(service, key)
+            for delay, chunk in entry.get("chunks") or []:
+                self.wait(delay)
+                yield chunk
+            if entry.get("error"):
+                raise self.recorded_error(entry["error"], make_error)
+            meta.update(entry.get("response") or {})
+            return
+
+        started = last = time.monotonic()
+        chunks = []
+        try:
+            for chunk in fn():
+                now = time.monotonic()
+                chunks.append([round(now - last, 4), chunk])
+                last = now
+                yield chunk
+        except record_errors as e:
+            self.record(service, key, request, started, time.monotonic() - started, error=error_record(e),
+                        chunks=chunks, op=op)
+            raise
+        self.record(service, key, request, started, time.monotonic() - started, response=dict(meta),
+                    chunks=chunks, op=op)
+
+    def entries(self, service: str = None) -> list:
+        """Recordings in start order, optionally for one service"""
+        with self._lock:
+            entries = list(self._entries)
+        return sorted((e for e in entries if service is None or e["service"] == service), key=lambda e: e["t"])
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def replay_traffic(entries: list, handler, speed: float = 1.0, workers: int = 16) -> list:
+    """
+    Re-issue recorded requests at their original offsets (divided by speed)
+    through handler(entry). Returns (entry, seconds, error) per request -
+    e.g. to play a production hour against a new build.
+    """
+    results = []
+    results_lock = threading.Lock()
+
+    def run(entry):
+        started = time.monotonic()
+        error = None
+        try:
+            handler(entry)
+        except Exception as e:
+            error = e
+        with results_lock:
+            results.append((entry, time.monotonic() - started, error))
+
+    origin = time.monotonic()
+    first = entries[0]["t"] if entries else 0.0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for entry in entries:
+            if speed > 0:
+                delay = (entry["t"] - first) / speed - (time.monotonic() - origin)
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(run, entry)
+    return results
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette():
+    """
+    Process-wide cassette for CASSETTE_MODE, or None when recording and
+    replay are off.
+    """
+    global _cassette
+    if CASSETTE_MODE == "off":
+        return None
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(CASSETTE_PATH, CASSETTE_MODE, CASSETTE_SPEED)
+                atexit.register(_cassette.close)
+    return _cassette
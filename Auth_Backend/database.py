@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
@@ -29,20 +30,94 @@ def init_db():
     This should be called once when the app starts.
     """
     try:
-        # Try relative import first (for Streamlit), fall back to direct import (for FastAPI)
-        try:
-            from .models import User, ContentHistory
-        except ImportError:
-            from models import User, ContentHistory
-        
+        from .models import User, ContentHistory
+
         # Create all tables
         Base.metadata.create_all(bind=engine)
+        upgrade_db()
         print("✅ Database tables initialized successfully!")
         return True
     except Exception as e:
         print(f"❌ Database initialization error: {str(e)}")
         return False
 
+# --------------------------------------------------
+# UPGRADE EXISTING DATABASES
+# --------------------------------------------------
+# create_all() skips tables that already exist, so indexes added later never
+# reach an existing users.db; these statements are idempotent.
+SCHEMA_UPGRADES = [
+    "CREATE INDEX IF NOT EXISTS ix_content_history_user_created_id "
+    "ON content_history (user_email, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_content_history_user_type "
+    "ON content_history (user_email, content_type, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_content_history_user_tone "
+    "ON content_history (user_email, tone, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_content_history_user_audience "
+    "ON content_history (user_email, audience, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_content_history_user_purpose "
+    "ON content_history (user_email, purpose, created_at, id)",
+]
+
+
+# --------------------------------------------------
+# FULL-TEXT SEARCH INDEX
+# --------------------------------------------------
+# External-content FTS5 table over content_history: it stores only the
+# inverted index, the text stays in content_history. The triggers keep it in
+# step with every insert/update/delete, whichever code path writes the row.
+SEARCH_TABLE = "content_history_fts"
+
+SEARCH_SCHEMA = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "title, generated_content, content='content_history', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS content_history_ai AFTER INSERT ON content_history BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, title, generated_content) "
+    "VALUES (new.id, new.title, new.generated_content); END",
+    f"CREATE TRIGGER IF NOT EXISTS content_history_ad AFTER DELETE ON content_history BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, generated_content) "
+    "VALUES ('delete', old.id, old.title, old.generated_content); END",
+    f"CREATE TRIGGER IF NOT EXISTS content_history_au AFTER UPDATE ON content_history BEGIN "
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, generated_content) "
+    "VALUES ('delete', old.id, old.title, old.generated_content); "
+    f"INSERT INTO {SEARCH_TABLE}(rowid, title, generated_content) "
+    "VALUES (new.id, new.title, new.generated_content); END",
+]
+
+# Set by upgrade_db(); False when this SQLite build has no FTS5
+search_available = False
+
+
+def _create_search_index(conn) -> bool:
+    """Create the FTS5 table and triggers, indexing existing drafts the first time"""
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    ).first()
+    for statement in SEARCH_SCHEMA:
+        conn.exec_driver_sql(statement)
+    if not exists:
+        conn.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def upgrade_db():
+    """
+    Apply SCHEMA_UPGRADES and the search index to the current database.
+    Safe to call on every startup.
+    """
+    global search_available
+    with engine.begin() as conn:
+        for statement in SCHEMA_UPGRADES:
+            conn.exec_driver_sql(statement)
+    try:
+        with engine.begin() as conn:
+            search_available = _create_search_index(conn)
+    except OperationalError as e:
+        # e.g. "no such module: fts5"; history search falls back to LIKE
+        search_available = False
+        print(f"⚠️ Full-text search unavailable: {str(e)}")
+
 # --------------------------------------------------
 # GET DATABASE SESSION
 # --------------------------------------------------
@@ -1,11 +1,27 @@
+import os
+import sys
+
 from fastapi import FastAPI
-from database import Base, engine
-from routes.auth import router
+
+# --------------------------------------------------
+# IMPORT ROOT
+# --------------------------------------------------
+# Everything is imported as Auth_Backend.*, the same way the Streamlit app
+# imports it, so each module (and its engine, Base, cassette) loads only once
+# even when uvicorn is started from this directory.
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from Auth_Backend.database import Base, engine, upgrade_db
+from Auth_Backend.routes.auth import router
+from Auth_Backend.routes.content import router as content_router
 
 # --------------------------------------------------
 # DATABASE INITIALIZATION
 # --------------------------------------------------
 Base.metadata.create_all(bind=engine)
+upgrade_db()
 
 # --------------------------------------------------
 # APPLICATION SETUP
@@ -19,6 +35,7 @@ app = FastAPI(
 # ROUTES
 # --------------------------------------------------
 app.include_router(router)
+app.include_router(content_router)
 
 # --------------------------------------------------
 # HEALTH CHECK
@@ -1,11 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, Index
 from datetime import datetime
 
-# Try relative import first (for Streamlit), fall back to direct import (for FastAPI)
-try:
-    from .database import Base
-except ImportError:
-    from database import Base
+from .database import Base
 
 class User(Base):
     __tablename__ = "users"
@@ -17,6 +13,16 @@ class User(Base):
 
 class ContentHistory(Base):
     __tablename__ = "content_history"
+    __table_args__ = (
+        # Keyset pagination: a user's drafts newest first, ties broken by id
+        Index("ix_content_history_user_created_id", "user_email", "created_at", "id"),
+        # Facets: GROUP BY counts read only the index, and filtering on one
+        # value still walks the drafts newest first
+        Index("ix_content_history_user_type", "user_email", "content_type", "created_at", "id"),
+        Index("ix_content_history_user_tone", "user_email", "tone", "created_at", "id"),
+        Index("ix_content_history_user_audience", "user_email", "audience", "created_at", "id"),
+        Index("ix_content_history_user_purpose", "user_email", "purpose", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_email = Column(String, index=True)
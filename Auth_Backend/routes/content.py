@@ -0,0 +1,207 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import json
+import os
+import sys
+
+from Auth_Backend.auth.jwt import verify_jwt
+
+# --------------------------------------------------
+# SHARED CONTENT PIPELINE
+# --------------------------------------------------
+# The LLM pipeline (caching, limiter, routing, parsing) lives with the
+# Streamlit app in Streamlit_app_Frontend/utils; the API runs the same code.
+# Its modules import the backend as Auth_Backend.*, like this file does.
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+FRONTEND_DIR = os.path.join(ROOT_DIR, "Streamlit_app_Frontend")
+for path in (ROOT_DIR, FRONTEND_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from utils.content_pipeline import (build_generation_prompt, generate_content, run_prompts_job,
+                                    evaluate_content)
+from utils.deadline import Deadline
+from utils.scheduler import scheduling
+from utils.token_budget import get_token_budget
+from utils.providers import get_provider
+
+router = APIRouter(tags=["content"])
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+# Threads for the blocking pipeline calls; Bedrock concurrency itself is
+# capped by the pipeline's adaptive limiter, not by this pool
+CONTENT_WORKERS = int(os.getenv("CONTENT_WORKERS", "32"))
+
+# HTTP status per pipeline failure (by exception type name); anything else is a 500
+ERROR_STATUS = {
+    "CircuitOpenError": 503,
+    "ProviderUnavailable": 503,
+    "ThrottledError": 429,
+    "LimiterTimeout": 429,
+    "ProviderThrottled": 429,
+    "DeadlineExceeded": 504,
+    "TimeoutError": 504,
+    "ProviderTimeout": 504,
+    "ConnectionError": 502,
+    "SchemaError": 502,
+}
+
+_executor = ThreadPoolExecutor(max_workers=CONTENT_WORKERS, thread_name_prefix="content")
+
+# The backend owns the Bedrock key (BEDROCK_API_KEY env var)
+get_provider(os.getenv("BEDROCK_API_KEY", ""))
+
+# --------------------------------------------------
+# AUTH DEPENDENCY
+# --------------------------------------------------
+bearer = HTTPBearer()
+
+
+def current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer)) -> str:
+    """Email of the caller, from the session JWT issued at login (magic-link tokens are rejected)"""
+    return verify_jwt(credentials.credentials)["sub"]
+
+# --------------------------------------------------
+# REQUEST MODELS
+# --------------------------------------------------
+class PromptsRequest(BaseModel):
+    idea: str
+
+
+class GenerateRequest(BaseModel):
+    selected_prompt: str
+    content_type: str
+    tone: str
+    audience: str
+    purpose: str
+    word_limit: int = 150
+    use_cache: bool = True
+
+
+class EvaluateRequest(BaseModel):
+    content: str
+    content_type: str
+    tone: str
+    audience: str
+    purpose: str
+    word_limit: int = None
+    mode: str = "llm"
+
+# --------------------------------------------------
+# HELPERS
+# --------------------------------------------------
+async def run_blocking(priority: str, user: str, fn, *args):
+    """
+    Run a blocking pipeline call on the worker pool, keeping the event loop
+    free, under the caller's scheduling class and fair share.
+    """
+    with scheduling(priority, user):
+        context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: context.run(fn, *args))
+
+
+def error_body(error: Exception) -> dict:
+    return {"detail": str(error) or type(error).__name__, "error_type": type(error).__name__}
+
+
+def error_response(error: Exception) -> JSONResponse:
+    return JSONResponse(error_body(error), status_code=ERROR_STATUS.get(type(error).__name__, 500))
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# --------------------------------------------------
+# PROMPT REFINEMENT
+# --------------------------------------------------
+@router.post("/prompts")
+async def prompts(request: PromptsRequest, email: str = Depends(current_user)):
+    try:
+        refined = await run_blocking("prompts", email, run_prompts_job, {"idea": request.idea}, None)
+    except Exception as e:
+        return error_response(e)
+    return {"prompts": refined}
+
+# --------------------------------------------------
+# GENERATION (SERVER-SENT EVENTS)
+# --------------------------------------------------
+@router.post("/generate")
+async def generate(request: GenerateRequest, email: str = Depends(current_user)):
+    """
+    Streams the cleaned content as it is written:
+      event: delta  data: {"text": "<new text>"}
+      event: done   data: {"content": "<final cleaned content>"}
+      event: error  data: {"detail": ..., "error_type": ...}
+    The caller saves the result to its own history.
+    """
+    params = {
+        "prompt": build_generation_prompt(request.content_type, request.tone, request.audience, request.purpose,
+                                          request.word_limit, request.selected_prompt),
+        "max_tokens": get_token_budget().max_tokens_for(request.content_type, request.word_limit),
+        "use_cache": request.use_cache,
+        "stream": True,
+        "content_type": request.content_type,
+        "word_limit": request.word_limit
+    }
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def report(shown: str):
+        # Called on the worker thread with the cleaned text so far
+        loop.call_soon_threadsafe(events.put_nowait, ("progress", shown))
+
+    async def produce():
+        try:
+            content = await run_blocking("interactive", email, generate_content, params, report,
+                                         Deadline.for_action("generation"))
+            await events.put(("done", content))
+        except Exception as e:
+            await events.put(("error", e))
+
+    async def stream():
+        # If the client goes away the generation still finishes and lands in the cache
+        task = asyncio.create_task(produce())
+        sent = 0
+        while True:
+            kind, value = await events.get()
+            if kind == "progress":
+                if len(value) > sent:
+                    yield sse("delta", {"text": value[sent:]})
+                    sent = len(value)
+            elif kind == "done":
+                yield sse("done", {"content": value})
+                break
+            else:
+                yield sse("error", error_body(value))
+                break
+        await task
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# --------------------------------------------------
+# QUALITY EVALUATION
+# --------------------------------------------------
+@router.post("/evaluate")
+async def evaluate(request: EvaluateRequest, email: str = Depends(current_user)):
+    try:
+        scores = await run_blocking(
+            "evaluation", email, evaluate_content, request.content, request.content_type, request.tone,
+            request.audience, request.purpose, Deadline.for_action("evaluation"), request.mode, request.word_limit
+        )
+    except Exception as e:
+        return error_response(e)
+    if not scores:
+        return JSONResponse({"detail": "Evaluation timed out", "error_type": "TimeoutError"}, status_code=504)
+    return {"scores": scores}
@@ -0,0 +1 @@
+# This file marks benchmarks as a Python package
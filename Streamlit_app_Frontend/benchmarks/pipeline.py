@@ -0,0 +1,330 @@
+"""
+End-to-end benchmark of the Content Studio pipeline.
+
+Runs simulated sessions - prompt refinement, generation (streamed or not),
+clean_model_output, AI evaluation and save_to_database - through the same
+job handlers the page uses (utils/content_pipeline.py), at a configurable
+concurrency, against a local, mock-server or replayed provider. Reports
+throughput, p50/p95/p99 per stage, DB write time and memory per session,
+and writes JSON results for comparing builds.
+
+Run from Streamlit_app_Frontend/:
+
+    python -m benchmarks.pipeline --sessions 200 --concurrency 16 --provider mock --out base.json
+    python -m benchmarks.pipeline --sessions 200 --concurrency 16 --provider mock --compare base.json
+
+Everything (users.db, llm_cache.db) is written to a scratch directory, never
+the real databases.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------------------
+# FIX IMPORT PATH (PROJECT + FRONTEND ROOT)
+# -------------------------------
+FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ROOT_DIR = os.path.dirname(FRONTEND_DIR)
+for path in (FRONTEND_DIR, ROOT_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# -------------------------------
+# WORKLOAD
+# -------------------------------
+IDEAS = [
+    "finishing my first marathon after a knee injury",
+    "our team shipping a new search feature in two weeks",
+    "lessons from mentoring three junior developers",
+    "switching careers from teaching to data science",
+    "what a failed product launch taught me about users",
+    "getting promoted to engineering manager",
+]
+PREFERENCES = [
+    ("LinkedIn Post", "Professional", "Recruiters", "Announce Achievement", 150),
+    ("Blog Post", "Conversational", "Technical Professionals", "Share Experience", 250),
+    ("Tweet Thread", "Inspirational", "General Audience", "Inspire Others", 120),
+]
+STAGES = ["session", "prompts", "generation", "clean", "evaluation", "parse", "db_write"]
+
+
+def percentile(values: list, p: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class Timings:
+    """Thread-safe latency samples per stage"""
+
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples[stage].append(seconds)
+
+    def timed(self, stage: str, fn):
+        """Wrap fn so every call is recorded under stage"""
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - started)
+        return wrapper
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self._samples.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "max": max(values)
+            }
+            for stage, values in samples.items() if values
+        }
+
+
+# -------------------------------
+# PROVIDERS
+# -------------------------------
+def build_provider(args):
+    """(provider, cleanup) for --provider; "env" keeps whatever LLM_PROVIDER / CASSETTE_MODE select"""
+    from utils.providers import get_provider, BedrockProvider, LocalProvider
+
+    if args.provider == "local":
+        return LocalProvider(tokens_per_second=args.tokens_per_second), None
+    if args.provider == "mock":
+        from tools.mock_bedrock_server import make_server, MockConfig
+        config = MockConfig(args.latency, args.tokens_per_second, args.max_concurrency, args.throttle_rate,
+                            args.error_rate, args.truncate_rate, args.malformed_rate, seed=args.seed)
+        server = make_server(config, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+        return BedrockProvider("benchmark", endpoint=endpoint), server.shutdown
+    if args.provider == "replay":
+        from Auth_Backend.cassette import Cassette
+        from utils.providers.cassette import CassetteProvider
+        return CassetteProvider(Cassette(args.cassette, "replay", args.speed)), None
+    return get_provider(), None
+
+
+# -------------------------------
+# SESSIONS
+# -------------------------------
+def run_session(i: int, args, timings: Timings, errors: Counter):
+    """One user's trip through the studio, stage by stage, like the page's jobs"""
+    from utils.content_pipeline import build_generation_prompt, run_prompts_job, run_generation_job, run_evaluation_job
+    from utils.scheduler import scheduling
+    from utils.token_budget import get_token_budget
+
+    email = f"bench-user-{i % args.users}@example.com"
+    idea = f"{IDEAS[i % len(IDEAS)]} (take {i % args.distinct_ideas})"
+    content_type, tone, audience, purpose, word_limit = PREFERENCES[i % len(PREFERENCES)]
+    noop = lambda partial: None
+
+    def stage(name: str, priority: str, fn):
+        started = time.perf_counter()
+        try:
+            with scheduling(priority, email):
+                return fn()
+        finally:
+            timings.add(name, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        prompts = stage("prompts", "prompts", lambda: run_prompts_job({"idea": idea}, noop))
+        selected = prompts[0]["prompt"]
+        prompt = build_generation_prompt(content_type, tone, audience, purpose, word_limit, selected)
+        params = {
+            "prompt": prompt,
+            "max_tokens": get_token_budget().max_tokens_for(content_type, word_limit),
+            "use_cache": True,
+            "stream": args.stream,
+            "email": email,
+            "title": selected,
+            "content_type": content_type,
+            "tone": tone,
+            "audience": audience,
+            "purpose": purpose,
+            "word_limit": word_limit
+        }
+        content = stage("generation", "interactive", lambda: run_generation_job(params, noop))
+        evaluation = {"content": content, "content_type": content_type, "tone": tone, "audience": audience,
+                      "purpose": purpose, "word_limit": word_limit}
+        scores = stage("evaluation", "evaluation", lambda: run_evaluation_job(evaluation, noop))
+        if not scores:
+            errors["NoScores"] += 1
+    except Exception as e:
+        errors[type(e).__name__] += 1
+        return
+    timings.add("session", time.perf_counter() - started)
+
+
+def instrument(timings: Timings):
+    """Time the pipeline's inner steps where the job handlers call them"""
+    import utils.content_pipeline as pipeline
+
+    pipeline.clean_model_output = timings.timed("clean", pipeline.clean_model_output)
+    pipeline.parse_structured = timings.timed("parse", pipeline.parse_structured)
+    pipeline.save_to_database = timings.timed("db_write", pipeline.save_to_database)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(args) -> dict:
+    # Scratch databases: the pipeline's SQLite paths are relative to the working directory
+    workdir = args.workdir or tempfile.mkdtemp(prefix="content-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    from Auth_Backend.database import init_db
+    from utils.concurrency import get_limiter
+    from utils.llm_cache import get_cache
+    from utils.providers import set_provider
+
+    init_db()
+    provider, cleanup = build_provider(args)
+    set_provider(provider)
+    timings = Timings()
+    errors = Counter()
+    instrument(timings)
+
+    if args.memory:
+        tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0] if args.memory else 0
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for i in range(args.sessions):
+                pool.submit(run_session, i, args, timings, errors)
+    finally:
+        elapsed = time.perf_counter() - started
+        if cleanup:
+            cleanup()
+
+    memory = None
+    if args.memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory = {
+            "peak_mb": round(peak / 1e6, 2),
+            "retained_per_session_kb": round((current - memory_before) / 1e3 / args.sessions, 2)
+        }
+
+    stages = timings.summary()
+    completed = stages.get("session", {}).get("count", 0)
+    return {
+        "build": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform()},
+        "config": {name: value for name, value in vars(args).items() if name not in ("out", "compare")},
+        "elapsed_seconds": round(elapsed, 3),
+        "sessions_completed": completed,
+        "throughput_sessions_per_second": round(completed / elapsed, 3) if elapsed else None,
+        "errors": dict(errors),
+        "stages": stages,
+        "memory": memory,
+        "provider_usage": provider.usage(),
+        "limiter": get_limiter().stats(),
+        "cache": get_cache().stats()
+    }
+
+
+# -------------------------------
+# REPORTING
+# -------------------------------
+def _ms(seconds) -> str:
+    return f"{seconds * 1000:9.1f}" if seconds is not None else "      n/a"
+
+
+def report(results: dict, baseline: dict = None):
+    print(f"\n{results['sessions_completed']}/{results['config']['sessions']} sessions in "
+          f"{results['elapsed_seconds']}s - {results['throughput_sessions_per_second']} sessions/s "
+          f"(concurrency {results['config']['concurrency']}, provider {results['config']['provider']})")
+    if results["errors"]:
+        print("errors: " + ", ".join(f"{name} x{count}" for name, count in results["errors"].items()))
+    print(f"\n{'stage':<12}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name in STAGES:
+        row = results["stages"].get(name)
+        if not row:
+            continue
+        line = f"{name:<12}{row['count']:>7}{_ms(row['p50'])}{_ms(row['p95'])}{_ms(row['p99'])}{_ms(row['max'])}"
+        base = (baseline or {}).get("stages", {}).get(name)
+        if base and base["p95"]:
+            line += f"   p95 {100 * (row['p95'] - base['p95']) / base['p95']:+.1f}% vs baseline"
+        print(line)
+    if results["memory"]:
+        print(f"\nmemory: peak {results['memory']['peak_mb']} MB, "
+              f"{results['memory']['retained_per_session_kb']} KB retained per session")
+    if baseline:
+        before = baseline.get("throughput_sessions_per_second")
+        after = results["throughput_sessions_per_second"]
+        if before and after:
+            print(f"throughput {100 * (after - before) / before:+.1f}% vs baseline "
+                  f"({baseline['build'].get('commit')})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Content Studio pipeline end to end")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=10, help="distinct users (fair-share queueing)")
+    parser.add_argument("--distinct-ideas", type=int, default=1000000,
+                        help="lower it to let sessions share prompts and hit the cache")
+    parser.add_argument("--stream", action="store_true", help="stream generations like the page's default")
+    parser.add_argument("--provider", choices=["local", "mock", "replay", "env"], default="local")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="local/mock decode speed")
+    parser.add_argument("--latency", default="lognormal:0.3,0.4", help="mock time to first token")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="mock capacity before 429s")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cassette", help="cassette for --provider replay")
+    parser.add_argument("--speed", type=float, default=0.0, help="replay time compression (0 = instant)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip tracemalloc (it adds overhead)")
+    parser.add_argument("--workdir", help="where the scratch databases go (default: a new temp dir)")
+    parser.add_argument("--out", help="write results as JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args(argv)
+    if args.provider == "replay" and not args.cassette:
+        parser.error("--provider replay needs --cassette")
+
+    out = os.path.abspath(args.out) if args.out else None
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = run(args)
+    report(results, baseline)
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nresults written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,8 @@
 import streamlit as st
-import requests
 import time
-import re
 import sys
 import os
-import json
 import base64
-from datetime import datetime
 
 # -------------------------------
 # PAGE CONFIG (Must be first!)
@@ -30,6 +26,18 @@ try:
     from Auth_Backend.database import SessionLocal, init_db
     from Auth_Backend.models import ContentHistory
     from utils.auth_gaurd import protect
+    from utils.llm_cache import make_cache_key
+    from utils.singleflight import get_group
+    from utils.deadline import ACTION_BUDGETS
+    from utils.token_budget import get_token_budget
+    from utils.speculation import get_speculator, SPECULATIVE_GENERATION
+    from utils.jobs import get_job_queue, DONE, FAILED
+    from utils.providers import get_provider
+    from utils.content_pipeline import (bedrock_payload, invoke_bedrock, build_generation_prompt, evaluate_content,
+                                        register_jobs)
+    from utils.content_api import CONTENT_API_URL, register_remote_jobs, set_token
+    from utils.history import (get_history_page, get_history_content, count_history, facet_counts,
+                               filters_active, highlight_snippet, HistorySummary, FACETS, HISTORY_PAGE_SIZE)
     
     # Initialize database tables if needed
     import os
@@ -44,12 +52,49 @@ except ImportError as e:
 # -------------------------------
 # AWS BEDROCK CONFIG
 # -------------------------------
-BEDROCK_API_KEY = st.secrets["BEDROCK_API_KEY"]
-BEDROCK_URL = "https://bedrock-runtime.us-east-1.amazonaws.com/model/amazon.nova-micro-v1:0/invoke"
+# Not needed with LLM_PROVIDER=local (utils/providers); the model tier is picked per call by the router
+try:
+    BEDROCK_API_KEY = st.secrets["BEDROCK_API_KEY"]
+except (KeyError, FileNotFoundError):
+    BEDROCK_API_KEY = ""
+# First call configures the process-wide provider the pipeline's workers use
+get_provider(BEDROCK_API_KEY)
+
+# Quality analysis: "local" (instant scorer), "llm" (Bedrock), or
+# "local_then_llm" (show local scores at once, then refine with Bedrock)
+EVALUATION_MODES = {
+    "local_then_llm": "⚡ Instant, then refined by AI",
+    "local": "⚡ Instant only (no AI cost)",
+    "llm": "🤖 AI only",
+}
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "local_then_llm")
+# Start quality analysis as soon as generated content is saved
+PRE_EVALUATE = os.getenv("PRE_EVALUATE", "1") == "1"
 
-HEADERS = {
-    "Content-Type": "application/json",
-    "Authorization": f"Bearer {BEDROCK_API_KEY}"
+# What the user sees when a background job fails (by exception type); anything else is an API error
+JOB_ERROR_MESSAGES = {
+    "CircuitOpenError": "🔌 The AI service is temporarily unavailable. Please try again shortly.",
+    "DeadlineExceeded": "⏱️ This is taking longer than expected. Please try again.",
+    "TimeoutError": "⏱️ This is taking longer than expected. Please try again.",
+    "ThrottledError": "⏳ The AI service is busy right now. Please try again in a few seconds.",
+    "LimiterTimeout": "⏳ The AI service is busy right now. Please try again in a few seconds.",
+    "ProviderThrottled": "⏳ The AI service is busy right now. Please try again in a few seconds.",
+    "ProviderTimeout": "⏱️ This is taking longer than expected. Please try again.",
+    "ProviderUnavailable": "🔌 The AI service is temporarily unavailable. Please try again shortly.",
+    "ConnectionError": "❌ Connection error. Please check your API settings.",
+    "SchemaError": "❌ Couldn't read the AI's suggestions. Please try again.",
+    "Interrupted": "⚠️ The server restarted while this was running. Please try again.",
+    "AuthError": "🔒 Your session has expired. Please log in again.",
+}
+# Extra time to keep polling a job after its own deadline should have ended it
+JOB_WAIT_GRACE_SECONDS = 5
+
+# Saved Drafts filter labels, by history facet
+HISTORY_FACET_LABELS = {
+    "content_type": "📝 Content Type",
+    "tone": "🎭 Tone",
+    "audience": "👥 Audience",
+    "purpose": "🎯 Purpose"
 }
 
 # -------------------------------
@@ -76,6 +121,21 @@ def init_session_state():
         "theme": "dark",
         "show_evaluation": False,
         "evaluation_scores": None,
+        "evaluation_mode": EVALUATION_MODE,
+        "evaluation_source": None,
+        "refine_evaluation": False,
+        "stream_generation": True,
+        "bypass_cache": False,
+        # Speculation runs the local pipeline, so it is off when the content API does the work
+        "speculative_generation": SPECULATIVE_GENERATION and not CONTENT_API_URL,
+        "speculation": None,
+        "last_preferences": None,
+        "pre_evaluate": PRE_EVALUATE,
+        "prompts_job": None,
+        "generation_job": None,
+        "evaluation_job": None,
+        "history": None,
+        "history_total": None,
         "user_templates": [],
         "default_templates": [
             {
@@ -113,138 +173,225 @@ init_session_state()
 # -------------------------------
 # DATABASE UTILITIES
 # -------------------------------
-def get_user_history(email: str):
-    """Fetch all history for a user"""
+def load_more_history():
+    """Append the next page of drafts (keyset-paginated) to the session's history list"""
+    history = st.session_state.history
     try:
-        db = SessionLocal()
-        items = (
-            db.query(ContentHistory)
-            .filter(ContentHistory.user_email == email)
-            .order_by(ContentHistory.created_at.desc())
-            .all()
-        )
-        db.close()
-        return items
+        items, cursor = get_history_page(history["email"], HISTORY_PAGE_SIZE, history["cursor"], history["search"],
+                                         history["filters"])
     except Exception as e:
         st.error(f"Database error: {str(e)}")
-        return []
+        return
+    history["items"].extend(items)
+    history["cursor"] = cursor
+
+def current_history(email: str, search: str = "", filters: dict = None):
+    """
+    The drafts shown on Saved Drafts, kept in session state so a rerun costs
+    no queries; the first page is fetched when the user, search or filters change.
+    """
+    history = st.session_state.history
+    if (history is None or history["email"] != email or history["search"] != search
+            or history["filters"] != filters):
+        history = st.session_state.history = {"email": email, "search": search, "filters": filters, "items": [],
+                                              "cursor": None, "bodies": {}, "facets": None}
+        load_more_history()
+    return history
+
+def history_facets():
+    """
+    Facet counts for the current search and filters, plus every value the user
+    has (so the filter options stay put as counts change). Counted in SQL when
+    the search or filters change, or after a delete.
+    """
+    history = st.session_state.history
+    if history["facets"] is None:
+        email, search, filters = history["email"], history["search"], history["filters"]
+        try:
+            counts = facet_counts(email, filters, search)
+            narrowed = search or filters_active(filters)
+            history["facets"] = {
+                "counts": counts,
+                "options": facet_counts(email) if narrowed else counts,
+                "matching": count_history(email, filters, search) if narrowed else None
+            }
+        except Exception as e:
+            st.error(f"Database error: {str(e)}")
+            return {"counts": {}, "options": {}, "matching": None}
+    return history["facets"]
+
+def history_filters() -> dict:
+    """Saved Drafts filters from the filter widgets' state (read before they are drawn)"""
+    filters = {facet: list(st.session_state.get(f"history_filter_{facet}", [])) for facet in FACETS}
+    created = st.session_state.get("history_filter_created") or ()
+    filters["created_from"] = created[0] if len(created) > 0 else None
+    filters["created_to"] = created[1] if len(created) > 1 else None
+    return filters
+
+def history_total(email: str) -> int:
+    """Number of saved drafts, counted once and kept in session until a draft is saved or deleted"""
+    total = st.session_state.history_total
+    if total is None or total["email"] != email:
+        try:
+            count = count_history(email)
+        except Exception as e:
+            st.error(f"Database error: {str(e)}")
+            return 0
+        total = st.session_state.history_total = {"email": email, "count": count}
+    return total["count"]
+
+def history_content(item: HistorySummary):
+    """A draft's generated text, fetched on first use and kept with the loaded list"""
+    bodies = st.session_state.history["bodies"] if st.session_state.history else {}
+    if item.id not in bodies:
+        try:
+            bodies[item.id] = get_history_content(st.session_state.get("email", ""), item.id) or ""
+        except Exception as e:
+            st.error(f"Database error: {str(e)}")
+            return ""
+    return bodies[item.id]
 
 def delete_history_item(item_id: int):
     """Delete a single history item"""
     try:
         db = SessionLocal()
-        item = db.query(ContentHistory).filter(ContentHistory.id == item_id).first()
-        if item:
-            db.delete(item)
-            db.commit()
+        # Bulk delete: no need to load the row (and its content) just to remove it
+        db.query(ContentHistory).filter(ContentHistory.id == item_id).delete(synchronize_session=False)
+        db.commit()
         db.close()
+        st.session_state.history_total = None
     except Exception as e:
         st.error(f"Delete error: {str(e)}")
 
-def load_history_item(item: ContentHistory):
+def load_history_item(item: HistorySummary):
     """Load history back into session"""
+    content = history_content(item)
     st.session_state.selected_prompt = item.title
+    st.session_state.speculation = None
     st.session_state.content_type = item.content_type
     st.session_state.tone = item.tone
     st.session_state.audience = item.audience
     st.session_state.purpose = item.purpose
     st.session_state.word_limit = item.word_limit
-    st.session_state.final_content = item.generated_content
+    st.session_state.final_content = content
     st.session_state.step = "generation"
     st.session_state.page = "new_content"
 
-def save_to_database(email, title, content_type, tone, audience, purpose, word_limit, content):
-    """Save generated content to database"""
-    try:
-        db = SessionLocal()
-        history = ContentHistory(
-            user_email=email,
-            title=title[:60],
-            content_type=content_type,
-            tone=tone,
-            audience=audience,
-            purpose=purpose,
-            word_limit=word_limit,
-            generated_content=content
-        )
-        db.add(history)
-        db.commit()
-        db.close()
-        return True
-    except Exception as e:
-        st.error(f"Save error: {str(e)}")
-        return False
-
 # -------------------------------
-# UTILITY FUNCTIONS
+# SESSION HELPERS
 # -------------------------------
-def clean_model_output(text: str) -> str:
-    text = re.sub(r"</?[^>]+>", "", text)
-    text = text.replace("<", "").replace(">", "")
-    return text.strip()
+# The pipeline itself (LLM calls, job handlers, saving) is in utils/content_pipeline.py
+def current_preferences():
+    """(content_type, tone, audience, purpose, word_limit) as currently set, or None if incomplete"""
+    prefs = (
+        st.session_state.content_type,
+        st.session_state.tone,
+        st.session_state.audience,
+        st.session_state.purpose,
+        st.session_state.word_limit
+    )
+    return prefs if all(prefs) else None
 
-def call_bedrock_api(prompt: str, max_tokens: int = 500, temperature: float = 0.7):
-    """Call Bedrock API"""
-    payload = {
-        "messages": [{"role": "user", "content": [{"text": prompt}]}],
-        "inferenceConfig": {"maxTokens": max_tokens, "temperature": temperature}
-    }
-    
-    try:
-        response = requests.post(BEDROCK_URL, headers=HEADERS, json=payload, timeout=30)
-        if response.status_code == 200:
-            return response.json()["output"]["message"]["content"][0]["text"]
-    except Exception as e:
-        st.error(f"API Error: {str(e)}")
-    return None
+def likely_preferences():
+    """Best guess at what the user will generate with: current/template, last used, then defaults"""
+    prefs = current_preferences()
+    if prefs:
+        return prefs
+    if st.session_state.last_preferences:
+        return tuple(st.session_state.last_preferences)
+    if not st.session_state.default_templates:
+        return None
+    template = st.session_state.default_templates[0]
+    return (template["content_type"], template["tone"], template["audience"], template["purpose"],
+            template["word_limit"])
 
-def evaluate_content(content: str, content_type: str, tone: str, audience: str, purpose: str):
-    """Evaluate content quality and return scores"""
-    evaluation_prompt = f"""Analyze this {content_type} and provide quality scores (0-100) for each criterion.
+def speculation_matches(spec, prompt: str) -> bool:
+    """Whether spec generated exactly this prompt (the cache key covers preferences and the selected prompt)"""
+    return bool(spec) and make_cache_key(bedrock_payload(prompt, spec["max_tokens"], 0.7)) == spec["cache_key"]
 
-Content to evaluate:
-{content}
+def start_speculation():
+    """
+    Start generating for the likely preferences while the user is still on
+    the preferences step. The result lands in the cache / singleflight, so a
+    matching "Generate Content" click is served without the wait.
+    """
+    prefs = likely_preferences()
+    spec = st.session_state.speculation
+    if prefs is None or CONTENT_API_URL:
+        return
+    
+    content_type, tone, audience, purpose, word_limit = prefs
+    prompt = build_generation_prompt(content_type, tone, audience, purpose, word_limit,
+                                     st.session_state.selected_prompt)
+    if speculation_matches(spec, prompt):
+        return
+    max_tokens = get_token_budget().max_tokens_for(content_type, word_limit)
+    cache_key = make_cache_key(bedrock_payload(prompt, max_tokens, 0.7))
+    
+    if get_speculator().try_start(cache_key, lambda: invoke_bedrock(prompt, max_tokens, 0.7), max_tokens,
+                                  user=st.session_state.get("email", "")):
+        st.session_state.speculation = {"preferences": prefs, "max_tokens": max_tokens, "cache_key": cache_key}
 
-Expected characteristics:
-- Tone: {tone}
-- Audience: {audience}
-- Purpose: {purpose}
+def submit_evaluation_job():
+    """Queue AI quality analysis of final_content (reuses a matching queued or unclaimed job)"""
+    params = {
+        "content": st.session_state.final_content,
+        "content_type": st.session_state.content_type,
+        "tone": st.session_state.tone,
+        "audience": st.session_state.audience,
+        "purpose": st.session_state.purpose,
+        "word_limit": st.session_state.word_limit
+    }
+    job_id = get_job_queue().submit(
+        "evaluation",
+        params,
+        owner=st.session_state.get("email", ""),
+        key=make_cache_key({"messages": ["evaluation", params]})
+    )
+    st.session_state.evaluation_job = {"id": job_id, "content": params["content"]}
 
-Provide scores in this exact JSON format:
-{{
-    "clarity": 85,
-    "engagement": 78,
-    "tone_consistency": 92,
-    "audience_relevance": 88,
-    "professionalism": 90
-}}
+def start_pre_evaluation():
+    """Kick off AI quality analysis of freshly generated content"""
+    st.session_state.evaluation_job = None
+    if st.session_state.pre_evaluate and st.session_state.evaluation_mode != "local":
+        submit_evaluation_job()
 
-Only return the JSON, no other text."""
-    
-    response = call_bedrock_api(evaluation_prompt, 300, 0.3)
-    
-    if response:
-        try:
-            cleaned = clean_model_output(response)
-            if "```json" in cleaned:
-                cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-            elif "```" in cleaned:
-                cleaned = cleaned.split("```")[1].split("```")[0].strip()
-            
-            scores = json.loads(cleaned)
-            scores["overall"] = int(sum(scores.values()) / len(scores))
-            return scores
-        except Exception as e:
-            return {
-                "clarity": 75,
-                "engagement": 70,
-                "tone_consistency": 80,
-                "audience_relevance": 75,
-                "professionalism": 78,
-                "overall": 76
-            }
-    
-    return None
+def evaluation_job_scores(timeout: float = 0):
+    """
+    Scores from the evaluation job for the content on screen, if it finishes
+    within timeout seconds; None while it is still running or if it failed.
+    """
+    pending = st.session_state.evaluation_job
+    if not pending or pending["content"] != st.session_state.final_content:
+        return None
+    jobs = get_job_queue()
+    job = jobs.wait(pending["id"], timeout)
+    if job is None or job["status"] == FAILED:
+        st.session_state.evaluation_job = None
+        return None
+    if job["status"] != DONE:
+        return None
+    jobs.claim(job["id"])
+    st.session_state.evaluation_job = None
+    return job["result"]
+
+# -------------------------------
+# BACKGROUND JOBS
+# -------------------------------
+def show_job_error(job: dict):
+    message = JOB_ERROR_MESSAGES.get(job["error_type"])
+    if message:
+        st.warning(message)
+    else:
+        st.error(f"API Error: {job['error']}")
+
+# With CONTENT_API_URL set, jobs call the backend's content API instead of Bedrock
+job_queue = get_job_queue()
+if CONTENT_API_URL:
+    set_token(st.session_state.get("email", ""), st.session_state.get("jwt"))
+    register_remote_jobs(job_queue)
+else:
+    register_jobs(job_queue)
 
 # -------------------------------
 # THEME CONFIGURATION
@@ -669,6 +816,21 @@ st.markdown(f"""
         box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
     }}
     
+    /* SEARCH SNIPPETS */
+    .search-snippet {{
+        color: {theme_colors['text_primary']};
+        font-size: 0.95rem;
+        line-height: 1.6;
+        margin-top: 0.75rem;
+    }}
+    
+    .search-snippet mark {{
+        background: rgba(139, 92, 246, 0.3);
+        color: {theme_colors['text_accent']};
+        padding: 0 0.15rem;
+        border-radius: 4px;
+    }}
+    
     /* EVALUATION SECTION */
     .evaluation-intro {{
         background: {theme_colors['bg_card']};
@@ -1001,6 +1163,7 @@ with st.sidebar:
             st.session_state.page = page_key
             if page_key == "new_content":
                 st.session_state.step = "input"
+                st.session_state.speculation = None
             st.rerun()
     
     st.markdown("<hr style='margin: 2rem 0 1rem 0; opacity: 0.3;'>", unsafe_allow_html=True)
@@ -1130,26 +1293,30 @@ if st.session_state.page == "new_content":
                 st.warning("⚠️ Please provide more detail about your idea")
             else:
                 st.session_state.user_idea = idea
-                
-                with st.spinner("🔮 Crafting refined prompts..."):
-                    prompt = f"""Generate 2 different refined prompts from: "{idea}"
-Return JSON: {{"prompt1": {{"title": "...", "prompt": "..."}}, "prompt2": {{"title": "...", "prompt": "..."}}}}"""
-                    
-                    response = call_bedrock_api(prompt, 800, 0.8)
-                    if response:
-                        try:
-                            cleaned = clean_model_output(response)
-                            if "```json" in cleaned:
-                                cleaned = cleaned.split("```json")[1].split("```")[0].strip()
-                            prompts_data = json.loads(cleaned)
-                            st.session_state.generated_prompts = [prompts_data["prompt1"], prompts_data["prompt2"]]
-                            st.session_state.step = "prompt_selection"
-                            st.rerun()
-                        except Exception as e:
-                            print(e)
-                            pass
-                    else:
-                        st.error("❌ Connection error. Please check your API settings.")
+                st.session_state.prompts_job = job_queue.submit(
+                    "prompts",
+                    {"idea": idea},
+                    owner=st.session_state.get("email", ""),
+                    key=make_cache_key({"messages": ["prompts", idea]})
+                )
+        
+        # Also reattaches after a rerun interrupted the wait
+        if st.session_state.prompts_job:
+            with st.spinner("🔮 Crafting refined prompts..."):
+                job = job_queue.wait(
+                    st.session_state.prompts_job, ACTION_BUDGETS["prompts"] + JOB_WAIT_GRACE_SECONDS
+                )
+            if job is None or job["status"] in (DONE, FAILED):
+                st.session_state.prompts_job = None
+            if job and job["status"] == DONE:
+                job_queue.claim(job["id"])
+                st.session_state.generated_prompts = job["result"]
+                st.session_state.step = "prompt_selection"
+                st.rerun()
+            elif job and job["status"] == FAILED:
+                show_job_error(job)
+            elif job:
+                st.warning("⏱️ This is taking longer than expected. Please try again.")
     
     elif st.session_state.step == "prompt_selection":
         st.markdown('<div class="header-title">Choose Your Direction</div>', unsafe_allow_html=True)
@@ -1170,6 +1337,7 @@ Return JSON: {{"prompt1": {{"title": "...", "prompt": "..."}}, "prompt2": {{"tit
                 
                 if st.button("Select This Prompt", key=f"sel_{idx}", use_container_width=True):
                     st.session_state.selected_prompt = opt['prompt']
+                    st.session_state.speculation = None
                     st.session_state.step = "preferences"
                     st.rerun()
     
@@ -1178,6 +1346,9 @@ Return JSON: {{"prompt1": {{"title": "...", "prompt": "..."}}, "prompt2": {{"tit
         st.caption("Fine-tune how your content will be generated")
         st.markdown("<br>", unsafe_allow_html=True)
         
+        if st.session_state.speculative_generation and st.session_state.selected_prompt:
+            start_speculation()
+        
         st.markdown(f"""
             <div class="content-card">
                 <div class="card-title">📌 Selected Prompt</div>
@@ -1239,6 +1410,14 @@ Return JSON: {{"prompt1": {{"title": "...", "prompt": "..."}}, "prompt2": {{"tit
             st.session_state.word_limit = word_limit
             
             if st.button("✨ Generate Content", use_container_width=True):
+                spec = st.session_state.speculation
+                if spec:
+                    matched = speculation_matches(spec, build_generation_prompt(
+                        content_type, tone, audience, purpose, word_limit, st.session_state.selected_prompt))
+                    get_speculator().record_outcome(matched)
+                    if not matched:
+                        # Wrong guess: drop it (anything already generated just stays in the cache)
+                        st.session_state.speculation = None
                 st.session_state.step = "generation"
                 st.rerun()
         else:
@@ -1250,29 +1429,80 @@ Return JSON: {{"prompt1": {{"title": "...", "prompt": "..."}}, "prompt2": {{"tit
         st.markdown("<br>", unsafe_allow_html=True)
         
         if not st.session_state.final_content:
-            with st.spinner("🎨 Creating your content..."):
-                prompt = f"""Write a {st.session_state.tone} {st.session_state.content_type} in approximately {st.session_state.word_limit} words.
-Audience: {st.session_state.audience}
-Purpose: {st.session_state.purpose}
-Content: {st.session_state.selected_prompt}
-
-Create engaging, authentic content that resonates with the target audience."""
+            prompt = build_generation_prompt(
+                st.session_state.content_type,
+                st.session_state.tone,
+                st.session_state.audience,
+                st.session_state.purpose,
+                st.session_state.word_limit,
+                st.session_state.selected_prompt
+            )
+            
+            # A rerun mid-generation reattaches to the running job instead of starting another
+            pending = st.session_state.generation_job
+            if not pending or pending["prompt"] != prompt:
+                # "Regenerate" asks for a fresh sample instead of the cached one
+                use_cache = not st.session_state.bypass_cache
+                st.session_state.bypass_cache = False
                 
-                content = call_bedrock_api(prompt, st.session_state.word_limit + 100, 0.7)
-                if content:
-                    st.session_state.final_content = clean_model_output(content)
-                    
-                    save_to_database(
-                        st.session_state.get("email", ""),
-                        st.session_state.selected_prompt,
-                        st.session_state.content_type,
-                        st.session_state.tone,
-                        st.session_state.audience,
-                        st.session_state.purpose,
-                        st.session_state.word_limit,
-                        st.session_state.final_content
-                    )
-                    st.rerun()
+                # Size maxTokens from observed tokens-per-word for this content type, not word_limit + 100
+                max_tokens = get_token_budget().max_tokens_for(st.session_state.content_type, st.session_state.word_limit)
+                
+                # Pick up a matching speculative generation: same maxTokens means the same cache key
+                spec = st.session_state.speculation
+                st.session_state.speculation = None
+                speculation_running = False
+                if use_cache and speculation_matches(spec, prompt):
+                    max_tokens = spec["max_tokens"]
+                    speculation_running = get_group("bedrock").in_flight(spec["cache_key"])
+                
+                email = st.session_state.get("email", "")
+                job_id = job_queue.submit(
+                    "generation",
+                    {
+                        "prompt": prompt,
+                        "max_tokens": max_tokens,
+                        "use_cache": use_cache,
+                        # A running speculation is joined by a blocking call rather than streamed twice
+                        "stream": st.session_state.stream_generation and not speculation_running,
+                        "email": email,
+                        "title": st.session_state.selected_prompt,
+                        "content_type": st.session_state.content_type,
+                        "tone": st.session_state.tone,
+                        "audience": st.session_state.audience,
+                        "purpose": st.session_state.purpose,
+                        "word_limit": st.session_state.word_limit
+                    },
+                    owner=email,
+                    key=make_cache_key({"messages": ["generation", email, prompt, max_tokens]}) if use_cache else None
+                )
+                pending = st.session_state.generation_job = {"id": job_id, "prompt": prompt}
+            
+            # Tokens render as the job streams them instead of behind a blank spinner
+            placeholder = st.empty()
+            job = None
+            with st.spinner("🎨 Creating your content..."):
+                for job in job_queue.watch(pending["id"], ACTION_BUDGETS["generation"] + JOB_WAIT_GRACE_SECONDS):
+                    if job and job["progress"]:
+                        placeholder.markdown(f'<div class="generated-output">{job["progress"]}</div>',
+                                             unsafe_allow_html=True)
+            
+            if job is None or job["status"] in (DONE, FAILED):
+                st.session_state.generation_job = None
+            if job and job["status"] == DONE:
+                job_queue.claim(job["id"])
+                st.session_state.final_content = job["result"]
+                # The new draft goes at the top of Saved Drafts
+                st.session_state.history = None
+                st.session_state.history_total = None
+                st.session_state.last_preferences = current_preferences()
+                start_pre_evaluation()
+                st.rerun()
+            elif job and job["status"] == FAILED:
+                placeholder.empty()
+                show_job_error(job)
+            elif job:
+                st.warning("⏱️ This is taking longer than expected. Please try again.")
         
         if st.session_state.final_content:
             st.markdown(f'<div class="generated-output">{st.session_state.final_content}</div>', unsafe_allow_html=True)
@@ -1295,6 +1525,7 @@ Create engaging, authentic content that resonates with the target audience."""
             with col3:
                 if st.button("🔄 Regenerate", use_container_width=True):
                     st.session_state.final_content = None
+                    st.session_state.bypass_cache = True
                     st.session_state.show_evaluation = False
                     st.session_state.evaluation_scores = None
                     st.rerun()
@@ -1362,20 +1593,42 @@ Create engaging, authentic content that resonates with the target audience."""
                 </div>
             """, unsafe_allow_html=True)
             
+            # Background analysis already finished: show it without waiting for a click
+            if not st.session_state.show_evaluation:
+                ready = evaluation_job_scores()
+                if ready:
+                    st.session_state.evaluation_scores = ready
+                    st.session_state.evaluation_source = "llm"
+                    st.session_state.refine_evaluation = False
+                    st.session_state.show_evaluation = True
+            
             if not st.session_state.show_evaluation:
                 if st.button("✨ Analyze Content Quality", use_container_width=True, key="evaluate_btn"):
+                    mode = st.session_state.evaluation_mode
+                    if mode != "local":
+                        # Joins the background analysis if one is already running for this content
+                        submit_evaluation_job()
                     with st.spinner("🔍 Analyzing your content..."):
-                        scores = evaluate_content(
-                            st.session_state.final_content,
-                            st.session_state.content_type,
-                            st.session_state.tone,
-                            st.session_state.audience,
-                            st.session_state.purpose
-                        )
-                        if scores:
-                            st.session_state.evaluation_scores = scores
-                            st.session_state.show_evaluation = True
-                            st.rerun()
+                        if mode == "llm":
+                            scores = evaluation_job_scores(ACTION_BUDGETS["evaluation"] + JOB_WAIT_GRACE_SECONDS)
+                        else:
+                            scores = evaluate_content(
+                                st.session_state.final_content,
+                                st.session_state.content_type,
+                                st.session_state.tone,
+                                st.session_state.audience,
+                                st.session_state.purpose,
+                                mode="local",
+                                word_limit=st.session_state.word_limit
+                            )
+                    if scores:
+                        st.session_state.evaluation_scores = scores
+                        st.session_state.evaluation_source = "llm" if mode == "llm" else "local"
+                        st.session_state.refine_evaluation = mode == "local_then_llm"
+                        st.session_state.show_evaluation = True
+                        st.rerun()
+                    else:
+                        st.warning("⏱️ This is taking longer than expected. Please try again.")
             
             # Show evaluation results AFTER the button is clicked
             if st.session_state.show_evaluation and st.session_state.evaluation_scores:
@@ -1419,9 +1672,22 @@ Create engaging, authentic content that resonates with the target audience."""
                 
                 st.markdown('</div>', unsafe_allow_html=True)
                 
+                if st.session_state.refine_evaluation:
+                    # Local scores are already on screen; swap in the AI scores when they land
+                    with st.spinner("🤖 Refining scores with AI..."):
+                        refined = evaluation_job_scores(ACTION_BUDGETS["evaluation"] + JOB_WAIT_GRACE_SECONDS)
+                    st.session_state.refine_evaluation = False
+                    if refined:
+                        st.session_state.evaluation_scores = refined
+                        st.session_state.evaluation_source = "llm"
+                        st.rerun()
+                elif st.session_state.evaluation_source == "local":
+                    st.caption("⚡ Instant estimate from the local scorer")
+                
                 if st.button("🔄 Re-analyze", use_container_width=True, key="reanalyze_btn"):
                     st.session_state.show_evaluation = False
                     st.session_state.evaluation_scores = None
+                    st.session_state.refine_evaluation = False
                     st.rerun()
 
 # ========== HISTORY PAGE ==========
@@ -1431,9 +1697,9 @@ elif st.session_state.page == "history":
     st.markdown("<br>", unsafe_allow_html=True)
     
     user_email = st.session_state.get("email", "")
-    history_items = get_user_history(user_email) if user_email else []
+    total_items = history_total(user_email) if user_email else 0
     
-    if not history_items:
+    if not total_items:
         st.markdown(f"""
             <div class="content-card" style="text-align: center; padding: 3rem;">
                 <div style="font-size: 3rem; margin-bottom: 1rem;">📝</div>
@@ -1444,14 +1710,37 @@ elif st.session_state.page == "history":
     else:
         st.markdown(f"""
             <div style="color: {theme_colors['text_secondary']}; margin-bottom: 1.5rem;">
-                📊 You have <strong style="color: {theme_colors['text_accent']};">{len(history_items)}</strong> saved items
+                📊 You have <strong style="color: {theme_colors['text_accent']};">{total_items}</strong> saved items
             </div>
         """, unsafe_allow_html=True)
         
-        search = st.text_input("🔍 Search history", placeholder="Search by title or content...", label_visibility="collapsed")
+        search = st.text_input("🔍 Search history", placeholder="Search by title or content (best matches first)...", label_visibility="collapsed")
+        filters = history_filters()
         
-        if search:
-            history_items = [h for h in history_items if search.lower() in h.title.lower() or search.lower() in h.generated_content.lower()]
+        # Only the pages loaded so far are held in session; "Load more" fetches the next one
+        history = current_history(user_email, search.strip(), filters)
+        history_items = history["items"]
+        facets = history_facets()
+        
+        with st.expander("🎛️ Filters", expanded=filters_active(filters)):
+            col1, col2 = st.columns(2)
+            for index, facet in enumerate(FACETS):
+                counts = facets["counts"].get(facet, {})
+                options = list(facets["options"].get(facet, {}))
+                options += [value for value in filters[facet] if value not in options]
+                with (col1 if index % 2 == 0 else col2):
+                    st.multiselect(
+                        HISTORY_FACET_LABELS[facet],
+                        options,
+                        key=f"history_filter_{facet}",
+                        format_func=lambda value, counts=counts: f"{value} ({counts.get(value, 0)})"
+                    )
+            st.date_input("📅 Created between", value=(), key="history_filter_created")
+        
+        if facets["matching"] is not None:
+            st.caption(f"{facets['matching']} matching drafts")
+        if (search or filters_active(filters)) and not history_items:
+            st.info("No drafts match your search and filters")
         
         st.markdown("<br>", unsafe_allow_html=True)
         
@@ -1468,20 +1757,31 @@ elif st.session_state.page == "history":
                     st.markdown(f"**Purpose:** {item.purpose}")
                     st.markdown(f"**Word Limit:** {item.word_limit} words")
                 
+                snippet = getattr(item, "snippet", None)
+                if snippet:
+                    st.markdown(f'<div class="search-snippet">{highlight_snippet(snippet)}</div>', unsafe_allow_html=True)
+                
                 st.markdown("---")
-                st.markdown("### 📝 Content")
-                st.markdown(f'<div class="generated-output">{item.generated_content}</div>', unsafe_allow_html=True)
+                # The body is only fetched once the user asks for it
+                body = history["bodies"].get(item.id)
+                if body is not None:
+                    st.markdown("### 📝 Content")
+                    st.markdown(f'<div class="generated-output">{body}</div>', unsafe_allow_html=True)
                 
                 col_a, col_b, col_c = st.columns(3)
                 
                 with col_a:
-                    st.download_button(
-                        "📥 Download",
-                        item.generated_content,
-                        file_name=f"content_{item.id}.txt",
-                        key=f"download_{item.id}",
-                        use_container_width=True
-                    )
+                    if body is not None:
+                        st.download_button(
+                            "📥 Download",
+                            body,
+                            file_name=f"content_{item.id}.txt",
+                            key=f"download_{item.id}",
+                            use_container_width=True
+                        )
+                    elif st.button("📖 Show Content", key=f"show_{item.id}", use_container_width=True):
+                        history_content(item)
+                        st.rerun()
                 
                 with col_b:
                     if st.button("↩️ Load & Edit", key=f"load_{item.id}", use_container_width=True):
@@ -1493,9 +1793,17 @@ elif st.session_state.page == "history":
                 with col_c:
                     if st.button("🗑️ Delete", key=f"delete_{item.id}", use_container_width=True):
                         delete_history_item(item.id)
+                        history["items"] = [h for h in history["items"] if h.id != item.id]
+                        history["bodies"].pop(item.id, None)
+                        history["facets"] = None
                         st.success("Deleted!")
                         time.sleep(0.5)
                         st.rerun()
+        
+        if history["cursor"] is not None:
+            if st.button("⬇️ Load more", use_container_width=True, key="history_load_more"):
+                load_more_history()
+                st.rerun()
 
 # ========== TEMPLATES PAGE ==========
 elif st.session_state.page == "templates":
@@ -1656,14 +1964,41 @@ elif st.session_state.page == "profile":
     
     st.markdown("<br>", unsafe_allow_html=True)
     
+    # Settings
+    st.markdown('<div class="content-card">', unsafe_allow_html=True)
+    st.markdown('<div class="card-title">⚙️ Studio Settings</div>', unsafe_allow_html=True)
+    
+    mode_keys = list(EVALUATION_MODES.keys())
+    st.session_state.evaluation_mode = st.selectbox(
+        "Quality analysis",
+        mode_keys,
+        index=mode_keys.index(st.session_state.evaluation_mode) if st.session_state.evaluation_mode in mode_keys else 0,
+        format_func=lambda key: EVALUATION_MODES[key],
+        key="sel_evaluation_mode"
+    )
+    st.session_state.speculative_generation = st.checkbox(
+        "Start generating before I click Generate",
+        value=st.session_state.speculative_generation,
+        help="Drafts the likely content in the background while you pick preferences",
+        key="chk_speculative_generation"
+    )
+    st.session_state.pre_evaluate = st.checkbox(
+        "Analyze quality in the background after generating",
+        value=st.session_state.pre_evaluate,
+        help="Uses an extra AI call per draft; turn off to only analyze on demand",
+        key="chk_pre_evaluate"
+    )
+
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
     # Statistics
     st.markdown('<div class="content-card">', unsafe_allow_html=True)
     st.markdown('<div class="card-title">📊 Your Activity Statistics</div>', unsafe_allow_html=True)
     
     user_email = st.session_state.get("email", "")
-    history_items = get_user_history(user_email) if user_email else []
-    
-    total_content = len(history_items)
+    total_content = history_total(user_email) if user_email else 0
     total_templates = len(st.session_state.default_templates) + len(st.session_state.user_templates)
     
     col1, col2 = st.columns(2)
@@ -1689,14 +2024,16 @@ elif st.session_state.page == "profile":
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Content Breakdown
-    if history_items:
+    if total_content:
         st.markdown("<br>", unsafe_allow_html=True)
         st.markdown('<div class="content-card">', unsafe_allow_html=True)
         st.markdown('<div class="card-title">📈 Content Breakdown</div>', unsafe_allow_html=True)
         
-        content_types = {}
-        for item in history_items:
-            content_types[item.content_type] = content_types.get(item.content_type, 0) + 1
+        try:
+            content_types = facet_counts(user_email, facets=("content_type",))["content_type"]
+        except Exception as e:
+            st.error(f"Database error: {str(e)}")
+            content_types = {}
         
         for content_type, count in content_types.items():
             percentage = (count / total_content) * 100
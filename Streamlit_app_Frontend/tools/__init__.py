@@ -0,0 +1 @@
+# This file marks tools as a Python package
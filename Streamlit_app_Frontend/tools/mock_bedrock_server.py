@@ -0,0 +1,384 @@
+"""
+Mock Bedrock runtime for load tests and incident reproduction.
+
+Speaks POST /model/{id}/invoke and /model/{id}/invoke-with-response-stream
+with Nova request/response bodies (the stream is a real AWS event stream),
+answers with the deterministic LocalProvider text, and injects latency,
+throttling, 5xx errors, truncation and malformed JSON on demand.
+
+Run from Streamlit_app_Frontend/:
+
+    python -m tools.mock_bedrock_server --port 8089 --latency lognormal:0.8,0.5 --throttle-rate 0.05
+
+and point the app at it:
+
+    BEDROCK_ENDPOINT=http://127.0.0.1:8089 streamlit run app.py
+
+GET /_stats returns counters; POST /_config with a JSON object changes any
+setting below while the server runs (e.g. {"throttle_rate": 0.5} to replay
+a throttling storm mid-test).
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+# -------------------------------
+# FIX IMPORT PATH (FRONTEND ROOT)
+# -------------------------------
+FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if FRONTEND_DIR not in sys.path:
+    sys.path.insert(0, FRONTEND_DIR)
+
+from utils.bedrock_stream import encode_nova_event, encode_exception
+from utils.providers.local import LocalProvider, TOKENS_PER_WORD
+
+# -------------------------------
+# MOCK CONFIG
+# -------------------------------
+# Relative speed per tier, picked from the model id (amazon.nova-lite-v1:0 -> lite),
+# so the router sees micro answer faster than lite and pro
+TIER_SPEED = {"micro": 1.0, "lite": 0.75, "pro": 0.5}
+_PATH = re.compile(r"^/model/(?P<model>[^/]+)/(?P<action>invoke|invoke-with-response-stream)$")
+_WORDS_PER_CHUNK = 4
+
+
+def parse_latency(spec: str):
+    """
+    Time-to-first-token distribution as a zero-argument sampler:
+    "fixed:0.2", "uniform:0.1,1.5" or "lognormal:<median>,<sigma>" (seconds).
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda rng: median * rng.lognormvariate(0, sigma)
+    raise ValueError(f"Bad latency spec {spec!r} (use fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA)")
+
+
+class MockConfig:
+    """Everything the fault injector reads; rates are probabilities per request"""
+
+    def __init__(self, latency="lognormal:0.6,0.4", tokens_per_second=80.0, max_concurrency=0,
+                 throttle_rate=0.0, error_rate=0.0, truncate_rate=0.0, malformed_rate=0.0,
+                 stream_error_rate=0.0, seed=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.max_concurrency = max_concurrency     # 0 = unlimited; above it requests get 429
+        self.throttle_rate = throttle_rate         # 429 ThrottlingException
+        self.error_rate = error_rate               # 500 InternalServerException / 503 ServiceUnavailable
+        self.truncate_rate = truncate_rate         # reply cut short with stopReason "max_tokens"
+        self.malformed_rate = malformed_rate       # JSON replies come back broken
+        self.stream_error_rate = stream_error_rate  # stream dies mid-way with an exception event
+        self.seed = seed
+
+    def update(self, changes: dict):
+        for name, value in changes.items():
+            if not hasattr(self, name) or name == "seed":
+                raise ValueError(f"Unknown setting {name!r}")
+            if name == "latency":
+                parse_latency(value)
+            else:
+                value = type(getattr(self, name))(value)
+            setattr(self, name, value)
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+# -------------------------------
+# FAULT INJECTION
+# -------------------------------
+def _malform(text: str, rng: random.Random) -> str:
+    """Break a JSON reply the ways models actually do"""
+    fault = rng.choice(["prose", "fence", "trailing_comma", "cut_off", "single_quotes"])
+    if fault == "prose":
+        return f"Sure! Here is the JSON you asked for:\n{text}\nLet me know if you need anything else."
+    if fault == "fence":
+        return f"```json\n{text}\n```"
+    if fault == "trailing_comma":
+        return text[:-1].rstrip() + ",}"
+    if fault == "single_quotes":
+        return text.replace('"', "'")
+    return text[:max(1, int(len(text) * 0.6))]
+
+
+def _truncate(text: str) -> str:
+    words = text.split(" ")
+    return " ".join(words[:max(1, len(words) // 2)])
+
+
+class MockBedrock:
+    """Reply generation, pacing and fault decisions shared by all handler threads"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.provider = LocalProvider(tokens_per_second=0)
+        self._rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.counters = {"requests": 0, "streams": 0, "throttled": 0, "errors": 0, "truncated": 0,
+                         "malformed": 0, "stream_errors": 0, "disconnects": 0, "max_in_flight": 0}
+
+    def roll(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self._rng.random() < rate
+
+    def sample_latency(self) -> float:
+        sampler = parse_latency(self.config.latency)
+        with self._lock:
+            return max(0.0, sampler(self._rng))
+
+    def count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def enter(self) -> bool:
+        """Take a concurrency slot; False when the simulated capacity is exhausted"""
+        with self._lock:
+            limit = self.config.max_concurrency
+            if limit and self.in_flight >= limit:
+                return False
+            self.in_flight += 1
+            self.counters["max_in_flight"] = max(self.counters["max_in_flight"], self.in_flight)
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def injected_error(self):
+        """(status, error type, message) for a request-level fault, or None"""
+        if self.roll(self.config.throttle_rate):
+            self.count("throttled")
+            return 429, "ThrottlingException", "Too many requests, please wait before trying again."
+        if self.roll(self.config.error_rate):
+            self.count("errors")
+            with self._lock:
+                unavailable = self._rng.random() < 0.5
+            if unavailable:
+                return 503, "ServiceUnavailableException", "The service is temporarily unavailable."
+            return 500, "InternalServerException", "The server encountered an internal error."
+        return None
+
+    def reply(self, payload: dict):
+        """(text, stop_reason, usage) with truncation / malformed JSON applied"""
+        completion = self.provider.complete(payload)
+        text, stop_reason, usage = completion.text, completion.stop_reason or "end_turn", dict(completion.usage)
+        if text.lstrip().startswith("{") and self.roll(self.config.malformed_rate):
+            self.count("malformed")
+            with self._lock:
+                text = _malform(text, self._rng)
+        if self.roll(self.config.truncate_rate):
+            self.count("truncated")
+            text, stop_reason = _truncate(text), "max_tokens"
+        usage["outputTokens"] = max(1, int(len(text.split()) * TOKENS_PER_WORD))
+        usage["totalTokens"] = usage["inputTokens"] + usage["outputTokens"]
+        return text, stop_reason, usage
+
+    def decode_seconds(self, tokens: int, speed: float) -> float:
+        rate = self.config.tokens_per_second * speed
+        return tokens / rate if rate > 0 else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": self.in_flight, **self.counters, "config": self.config.as_dict()}
+
+
+def _tier_speed(model_id: str) -> float:
+    for tier, speed in TIER_SPEED.items():
+        if tier in model_id:
+            return speed
+    return 1.0
+
+
+# -------------------------------
+# HTTP HANDLER
+# -------------------------------
+class MockBedrockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockBedrock/1.0"
+    mock: MockBedrock = None
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: dict, error_type: str = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if error_type:
+            self.send_header("x-amzn-ErrorType", f"{error_type}:http://internal.amazon.com/coral/com.amazon.bedrock/")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/_stats":
+            self._send_json(200, self.mock.stats())
+        else:
+            self._send_json(404, {"message": "Not found"})
+
+    def do_POST(self):
+        try:
+            payload = self._read_json()
+        except ValueError:
+            self._send_json(400, {"message": "Malformed request body"}, "ValidationException")
+            return
+
+        if self.path == "/_config":
+            try:
+                self.mock.config.update(payload)
+            except (ValueError, TypeError) as e:
+                self._send_json(400, {"message": str(e)})
+                return
+            self._send_json(200, self.mock.config.as_dict())
+            return
+
+        match = _PATH.match(unquote(self.path))
+        if not match:
+            self._send_json(404, {"message": f"Unknown path {self.path}"}, "UnknownOperationException")
+            return
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._send_json(403, {"message": "Missing bearer token"}, "AccessDeniedException")
+            return
+        if not payload.get("messages"):
+            self._send_json(400, {"message": "messages is required"}, "ValidationException")
+            return
+
+        self.mock.count("requests")
+        if not self.mock.enter():
+            self.mock.count("throttled")
+            self._send_json(429, {"message": "Too many concurrent requests"}, "ThrottlingException")
+            return
+        try:
+            speed = _tier_speed(match.group("model"))
+            if match.group("action") == "invoke":
+                self._invoke(payload, speed)
+            else:
+                self._invoke_stream(payload, speed)
+        except (BrokenPipeError, ConnectionResetError):
+            self.mock.count("disconnects")
+            self.close_connection = True
+        finally:
+            self.mock.leave()
+
+    def _invoke(self, payload: dict, speed: float):
+        started = time.monotonic()
+        time.sleep(self.mock.sample_latency() / speed)
+        error = self.mock.injected_error()
+        if error:
+            status, error_type, message = error
+            self._send_json(status, {"message": message}, error_type)
+            return
+
+        text, stop_reason, usage = self.mock.reply(payload)
+        time.sleep(self.mock.decode_seconds(usage["outputTokens"], speed))
+        self._send_json(200, {
+            "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+            "stopReason": stop_reason,
+            "usage": usage,
+            "metrics": {"latencyMs": int((time.monotonic() - started) * 1000)}
+        })
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _invoke_stream(self, payload: dict, speed: float):
+        self.mock.count("streams")
+        started = time.monotonic()
+        time.sleep(self.mock.sample_latency() / speed)
+        error = self.mock.injected_error()
+        if error:
+            status, error_type, message = error
+            self._send_json(status, {"message": message}, error_type)
+            return
+
+        text, stop_reason, usage = self.mock.reply(payload)
+        pieces = re.findall(r"\s*\S+", text)
+        chunks = ["".join(pieces[i:i + _WORDS_PER_CHUNK]) for i in range(0, len(pieces), _WORDS_PER_CHUNK)]
+        fail_at = len(chunks) // 2 if self.mock.roll(self.mock.config.stream_error_rate) else None
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        self._write_chunk(encode_nova_event({"messageStart": {"role": "assistant"}}))
+        for i, chunk in enumerate(chunks):
+            if i == fail_at:
+                self.mock.count("stream_errors")
+                self._write_chunk(encode_exception("throttlingException", "Too many tokens, please wait."))
+                self.wfile.write(b"0\r\n\r\n")
+                return
+            time.sleep(self.mock.decode_seconds(int(len(chunk.split()) * TOKENS_PER_WORD), speed))
+            self._write_chunk(encode_nova_event({"contentBlockDelta": {"delta": {"text": chunk}, "contentBlockIndex": 0}}))
+        self._write_chunk(encode_nova_event({"contentBlockStop": {"contentBlockIndex": 0}}))
+        self._write_chunk(encode_nova_event({"messageStop": {"stopReason": stop_reason}}))
+        self._write_chunk(encode_nova_event({"metadata": {
+            "usage": usage,
+            "metrics": {"latencyMs": int((time.monotonic() - started) * 1000)}
+        }}))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+# -------------------------------
+# SERVER
+# -------------------------------
+def make_server(config: MockConfig, host: str = "127.0.0.1", port: int = 8089, verbose: bool = False):
+    """Build (not start) a threaded mock server; port 0 picks a free port"""
+    handler = type("Handler", (MockBedrockHandler,), {"mock": MockBedrock(config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mock Bedrock runtime with latency and fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="lognormal:0.6,0.4",
+                        help="time to first token: fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="decode speed of micro (0 = instant)")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="429 above this many in-flight requests")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--stream-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None, help="make fault decisions reproducible")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    parse_latency(args.latency)
+    config = MockConfig(args.latency, args.tokens_per_second, args.max_concurrency, args.throttle_rate,
+                        args.error_rate, args.truncate_rate, args.malformed_rate, args.stream_error_rate, args.seed)
+    server = make_server(config, args.host, args.port, args.verbose)
+    print(f"Mock Bedrock listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
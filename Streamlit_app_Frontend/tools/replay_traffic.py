@@ -0,0 +1,73 @@
+"""
+Replay recorded Bedrock traffic against the current build.
+
+Re-issues every request in a cassette (recorded with CASSETTE_MODE=record)
+at its original offset, optionally time-compressed, through the provider
+selected by LLM_PROVIDER / BEDROCK_ENDPOINT, and reports latency and errors
+next to what was recorded.
+
+    python -m tools.replay_traffic cassette.jsonl.gz --speed 10
+"""
+import argparse
+import os
+import sys
+from collections import Counter
+
+# -------------------------------
+# FIX IMPORT PATH (PROJECT + FRONTEND ROOT)
+# -------------------------------
+FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ROOT_DIR = os.path.dirname(FRONTEND_DIR)
+for path in (FRONTEND_DIR, ROOT_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from Auth_Backend.cassette import Cassette, replay_traffic
+from utils.providers import get_provider
+
+
+def send(provider, entry: dict):
+    request = entry["request"]
+    if entry["op"] == "stream":
+        for _ in provider.stream(request["payload"], request["tier"]):
+            pass
+    else:
+        provider.complete(request["payload"], request["tier"])
+
+
+def percentile(values: list, p: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def summarize(label: str, durations: list, errors: Counter) -> str:
+    p50, p95 = percentile(durations, 0.5), percentile(durations, 0.95)
+    fmt = lambda value: f"{value:.3f}s" if value is not None else "n/a"
+    failed = ", ".join(f"{name} x{count}" for name, count in errors.most_common()) or "none"
+    return f"{label:<9} calls={len(durations):<5} p50={fmt(p50)} p95={fmt(p95)} errors: {failed}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a cassette's Bedrock traffic against this build")
+    parser.add_argument("cassette")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression (0 = fire as fast as possible)")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    entries = Cassette(args.cassette, "replay").entries("bedrock")
+    if not entries:
+        sys.exit(f"No Bedrock traffic in {args.cassette}")
+
+    provider = get_provider()
+    results = replay_traffic(entries, lambda entry: send(provider, entry), args.speed, args.workers)
+
+    recorded_errors = Counter(e["error"]["type"] for e in entries if e.get("error"))
+    replayed_errors = Counter(type(error).__name__ for _, _, error in results if error is not None)
+    print(summarize("recorded", [e["duration"] for e in entries], recorded_errors))
+    print(summarize("replayed", [seconds for _, seconds, _ in results], replayed_errors))
+
+
+if __name__ == "__main__":
+    main()
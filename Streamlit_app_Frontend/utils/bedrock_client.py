@@ -0,0 +1,163 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# -------------------------------
+# CLIENT CONFIG
+# -------------------------------
+# Separate connect/read timeouts: a dead endpoint fails fast on connect,
+# while long generations still get time to finish reading.
+CONNECT_TIMEOUT = float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("BEDROCK_READ_TIMEOUT", "30"))
+
+# Read timeouts scale with the requested output size instead of a flat 30s
+BASE_READ_TIMEOUT = float(os.getenv("BEDROCK_BASE_READ_TIMEOUT", "3"))
+OUTPUT_TOKENS_PER_SECOND = float(os.getenv("BEDROCK_OUTPUT_TOKENS_PER_SECOND", "50"))
+
+# Max keep-alive connections held open to bedrock-runtime per process
+POOL_CONNECTIONS = int(os.getenv("BEDROCK_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("BEDROCK_POOL_MAXSIZE", "16"))
+
+# HTTP/2 is only used when explicitly enabled and httpx[http2] is installed
+USE_HTTP2 = os.getenv("BEDROCK_HTTP2", "0") == "1"
+
+_client = None
+_session = None
+_client_lock = threading.Lock()
+
+
+# -------------------------------
+# CLIENT FACTORIES
+# -------------------------------
+def _build_requests_session():
+    """Create a keep-alive requests session with a bounded connection pool"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=True
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _build_httpx_client():
+    """Create an HTTP/2 httpx client, or None if httpx/h2 is unavailable"""
+    try:
+        import httpx
+        import h2  # noqa: F401  (required by httpx for http2=True)
+    except ImportError:
+        return None
+
+    return httpx.Client(
+        http2=True,
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=POOL_MAXSIZE,
+            max_keepalive_connections=POOL_MAXSIZE
+        )
+    )
+
+
+def get_client():
+    """
+    Return the process-wide HTTP client.
+    Streamlit re-executes page scripts on every rerun, but this module is
+    imported once, so every session in the process shares the same pool.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client = _build_httpx_client() if USE_HTTP2 else None
+                _client = client if client is not None else _build_requests_session()
+    return _client
+
+
+def get_session() -> requests.Session:
+    """
+    The process-wide keep-alive requests session, for callers that need the
+    requests API (e.g. the content API client): the Bedrock client itself
+    unless that is the HTTP/2 httpx client.
+    """
+    global _session
+    client = get_client()
+    if isinstance(client, requests.Session):
+        return client
+    if _session is None:
+        with _client_lock:
+            if _session is None:
+                _session = _build_requests_session()
+    return _session
+
+
+# -------------------------------
+# REQUESTS
+# -------------------------------
+def _normalize_timeout(timeout):
+    """Turn None / a number / a (connect, read) tuple into a (connect, read) tuple"""
+    if timeout is None:
+        return (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if isinstance(timeout, tuple):
+        return timeout
+    return (min(CONNECT_TIMEOUT, timeout), timeout)
+
+
+def read_timeout_for(max_tokens: int) -> float:
+    """Generous upper bound on how long a response of max_tokens should take"""
+    return min(READ_TIMEOUT, BASE_READ_TIMEOUT + max_tokens / OUTPUT_TOKENS_PER_SECOND)
+
+
+def post_json(url: str, headers: dict, payload: dict, timeout=None):
+    """
+    POST a JSON payload over the shared pool.
+    timeout may be a single number or a (connect, read) tuple.
+    """
+    timeout = _normalize_timeout(timeout)
+
+    client = get_client()
+    if isinstance(client, requests.Session):
+        return client.post(url, headers=headers, json=payload, timeout=timeout)
+
+    import httpx
+    connect, read = timeout
+    return client.post(
+        url,
+        headers=headers,
+        json=payload,
+        timeout=httpx.Timeout(read, connect=connect)
+    )
+
+
+def post_json_stream(url: str, headers: dict, payload: dict, timeout=None):
+    """
+    POST a JSON payload and yield the raw response body in chunks as it
+    arrives. Raises requests.HTTPError (or httpx.HTTPStatusError) on non-200.
+    """
+    timeout = _normalize_timeout(timeout)
+
+    client = get_client()
+    if isinstance(client, requests.Session):
+        with client.post(url, headers=headers, json=payload, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=None):
+                if chunk:
+                    yield chunk
+        return
+
+    import httpx
+    connect, read = timeout
+    with client.stream(
+        "POST",
+        url,
+        headers=headers,
+        json=payload,
+        timeout=httpx.Timeout(read, connect=connect)
+    ) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            if chunk:
+                yield chunk
@@ -0,0 +1,149 @@
+import base64
+import json
+import struct
+import zlib
+
+# -------------------------------
+# AWS EVENT STREAM DECODING
+# -------------------------------
+# invoke-with-response-stream answers with application/vnd.amazon.eventstream:
+#   [total_len:4][headers_len:4][prelude_crc:4][headers][payload][message_crc:4]
+# Each "chunk" event carries {"bytes": "<base64 Nova event JSON>"}.
+
+_PRELUDE_LEN = 12
+_TRAILER_LEN = 4
+
+# header value type -> fixed size in bytes (string/bytes types are length-prefixed)
+_FIXED_HEADER_SIZES = {0: 0, 1: 0, 2: 1, 3: 2, 4: 4, 5: 8, 8: 8, 9: 16}
+
+
+class BedrockStreamError(Exception):
+    """Raised when the stream carries an exception event or is malformed"""
+
+    def __init__(self, message: str, error_type: str = "StreamError"):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def _parse_headers(raw: bytes) -> dict:
+    headers = {}
+    pos = 0
+    while pos < len(raw):
+        name_len = raw[pos]
+        pos += 1
+        name = raw[pos:pos + name_len].decode("utf-8")
+        pos += name_len
+        value_type = raw[pos]
+        pos += 1
+
+        if value_type in (6, 7):
+            (value_len,) = struct.unpack(">H", raw[pos:pos + 2])
+            pos += 2
+            value = raw[pos:pos + value_len]
+            pos += value_len
+            if value_type == 7:
+                value = value.decode("utf-8")
+        elif value_type in _FIXED_HEADER_SIZES:
+            size = _FIXED_HEADER_SIZES[value_type]
+            value = raw[pos:pos + size]
+            pos += size
+            if value_type in (0, 1):
+                value = value_type == 0
+        else:
+            raise BedrockStreamError(f"Unknown event header type {value_type}")
+
+        headers[name] = value
+    return headers
+
+
+class EventStreamDecoder:
+    """Incrementally split raw response bytes into (headers, payload) messages"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes):
+        self._buffer.extend(data)
+        while len(self._buffer) >= _PRELUDE_LEN:
+            total_len, headers_len, prelude_crc = struct.unpack(">III", self._buffer[:_PRELUDE_LEN])
+            if zlib.crc32(self._buffer[:8]) != prelude_crc:
+                raise BedrockStreamError("Corrupt event stream prelude")
+            if len(self._buffer) < total_len:
+                return
+
+            message = bytes(self._buffer[:total_len])
+            del self._buffer[:total_len]
+
+            (message_crc,) = struct.unpack(">I", message[-_TRAILER_LEN:])
+            if zlib.crc32(message[:-_TRAILER_LEN]) != message_crc:
+                raise BedrockStreamError("Corrupt event stream message")
+
+            headers_end = _PRELUDE_LEN + headers_len
+            headers = _parse_headers(message[_PRELUDE_LEN:headers_end])
+            payload = message[headers_end:-_TRAILER_LEN]
+            yield headers, payload
+
+
+def encode_message(headers: dict, payload: bytes) -> bytes:
+    """Frame one event stream message (string headers only) - the inverse of EventStreamDecoder"""
+    raw_headers = b""
+    for name, value in headers.items():
+        name, value = name.encode("utf-8"), value.encode("utf-8")
+        raw_headers += bytes([len(name)]) + name + bytes([7]) + struct.pack(">H", len(value)) + value
+    total_len = _PRELUDE_LEN + len(raw_headers) + len(payload) + _TRAILER_LEN
+    prelude = struct.pack(">II", total_len, len(raw_headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + raw_headers + payload
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+def encode_nova_event(event: dict) -> bytes:
+    """Frame a Nova streaming event the way Bedrock sends it (a base64 "chunk")"""
+    body = json.dumps({"bytes": base64.b64encode(json.dumps(event).encode("utf-8")).decode("ascii")})
+    headers = {":event-type": "chunk", ":content-type": "application/json", ":message-type": "event"}
+    return encode_message(headers, body.encode("utf-8"))
+
+
+def encode_exception(error_type: str, message: str) -> bytes:
+    """Frame a stream exception event (e.g. throttlingException mid-stream)"""
+    headers = {":exception-type": error_type, ":content-type": "application/json", ":message-type": "exception"}
+    return encode_message(headers, json.dumps({"message": message}).encode("utf-8"))
+
+
+# -------------------------------
+# NOVA EVENTS
+# -------------------------------
+def iter_nova_events(chunks):
+    """Decode raw byte chunks into Nova streaming event dicts"""
+    decoder = EventStreamDecoder()
+    for chunk in chunks:
+        for headers, payload in decoder.feed(chunk):
+            message_type = headers.get(":message-type", "event")
+            if message_type == "exception":
+                error_type = headers.get(":exception-type", "StreamError")
+                try:
+                    message = json.loads(payload).get("message", "")
+                except ValueError:
+                    message = payload.decode("utf-8", "replace")
+                raise BedrockStreamError(message or error_type, error_type)
+
+            body = json.loads(payload)
+            if "bytes" in body:
+                body = json.loads(base64.b64decode(body["bytes"]))
+            yield body
+
+
+def iter_text_deltas(chunks, meta: dict = None):
+    """
+    Yield only the generated text fragments from a Nova response stream.
+    If meta is given, the stop reason and token usage are recorded in it.
+    """
+    for event in iter_nova_events(chunks):
+        if meta is not None:
+            if "messageStop" in event:
+                meta["stop_reason"] = event["messageStop"].get("stopReason")
+            if "metadata" in event:
+                meta["usage"] = event["metadata"].get("usage")
+        delta = event.get("contentBlockDelta", {}).get("delta", {})
+        text = delta.get("text")
+        if text:
+            yield text
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+
+# -------------------------------
+# BREAKER CONFIG
+# -------------------------------
+FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+HALF_OPEN_TRIALS = int(os.getenv("BREAKER_HALF_OPEN_TRIALS", "1"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Bedrock is considered down; the call was rejected without being sent"""
+
+
+class CircuitBreaker:
+    """
+    Opens after FAILURE_THRESHOLD consecutive failures or timeouts and
+    rejects calls immediately while open. After RESET_TIMEOUT it lets a few
+    trial calls through (half-open): a success closes it again, a failure
+    re-opens it. Every call that allow() lets through must end in
+    record_success(), record_failure() or release().
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 half_open_trials: int = HALF_OPEN_TRIALS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_trials = half_open_trials
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def _maybe_half_open(self):
+        now = time.monotonic()
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._half_opened_at = now
+            self._trials = 0
+        elif self._state == HALF_OPEN and now - self._half_opened_at >= self.reset_timeout:
+            # The trials never reported back (e.g. an abandoned stream): hand out fresh ones
+            self._half_opened_at = now
+            self._trials = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream right now"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                self.rejected += 1
+                return False
+            if self._state == HALF_OPEN:
+                if self._trials >= self.half_open_trials:
+                    self.rejected += 1
+                    return False
+                self._trials += 1
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trials = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trials = 0
+
+    def release(self):
+        """An allowed call ended without saying anything about the backend (e.g. it timed out in our own queue)"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def call(self, fn, is_failure=None, is_failure_error=None):
+        """
+        Run fn through the breaker. A result for which is_failure(result) is
+        true counts as a failure; so do exceptions, or only those for which
+        is_failure_error(error) is true when it is given (others release the call).
+        """
+        if not self.allow():
+            raise CircuitOpenError("Circuit open: AI service unavailable")
+        try:
+            result = fn()
+        except Exception as e:
+            if is_failure_error is None or is_failure_error(e):
+                self.record_failure()
+            else:
+                self.release()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        if is_failure is not None and is_failure(result):
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures, "rejected": self.rejected}
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_breaker() -> CircuitBreaker:
+    """Return the process-wide Bedrock circuit breaker"""
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker()
+    return _breaker
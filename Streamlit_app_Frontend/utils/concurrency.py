@@ -0,0 +1,179 @@
+import os
+import random
+import threading
+import time
+
+from utils.bedrock_client import POOL_MAXSIZE
+from utils.scheduler import FairQueue, DEFAULT_PRIORITY
+
+# -------------------------------
+# LIMITER CONFIG
+# -------------------------------
+MIN_LIMIT = int(os.getenv("BEDROCK_MIN_CONCURRENCY", "1"))
+# Every Bedrock request (hedges and streams included) holds a limiter slot
+# for as long as it holds a pooled connection. Past the pool size a request
+# would block on the pool (pool_block=True) with no timeout and no regard
+# for its deadline, so the limit never goes above it.
+MAX_LIMIT = min(int(os.getenv("BEDROCK_MAX_CONCURRENCY", "32")), POOL_MAXSIZE)
+INITIAL_LIMIT = int(os.getenv("BEDROCK_INITIAL_CONCURRENCY", "4"))
+
+# A call slower than this counts as a latency spike
+LATENCY_TARGET = float(os.getenv("BEDROCK_LATENCY_TARGET", "8"))
+
+# Multiplicative decrease factors
+THROTTLE_BACKOFF = 0.5
+LATENCY_BACKOFF = 0.9
+
+# Retry policy for throttling / transient 5xx / network errors
+RETRY_BUDGET_SECONDS = float(os.getenv("BEDROCK_RETRY_BUDGET", "20"))
+MAX_ATTEMPTS = int(os.getenv("BEDROCK_MAX_ATTEMPTS", "4"))
+BASE_DELAY = 0.25
+MAX_DELAY = 4.0
+
+THROTTLE_STATUS = {429}
+
+
+class ThrottledError(Exception):
+    """Bedrock kept throttling us and the retry budget ran out"""
+
+
+class LimiterTimeout(ThrottledError):
+    """No concurrency slot became free within the allowed wait"""
+
+
+def is_throttle(response) -> bool:
+    if response.status_code in THROTTLE_STATUS:
+        return True
+    error_type = response.headers.get("x-amzn-ErrorType", "")
+    return "Throttling" in error_type or "ServiceUnavailable" in error_type
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """Throttling surfaced as an exception (HTTP error or stream exception event)"""
+    response = getattr(error, "response", None)
+    if response is not None and getattr(response, "status_code", None) in THROTTLE_STATUS:
+        return True
+    return "throttling" in getattr(error, "error_type", "").lower()
+
+
+# -------------------------------
+# AIMD CONCURRENCY LIMITER
+# -------------------------------
+class AdaptiveLimiter:
+    """
+    Process-wide cap on in-flight Bedrock calls.
+    The limit grows by about one slot per limit's worth of healthy calls
+    (additive increase) and is cut multiplicatively on throttling or
+    latency spikes, so bursts queue up instead of failing outright.
+    Queued callers are admitted by priority class, then by per-user fair
+    share (see FairQueue), not in arrival order.
+    """
+
+    def __init__(self, initial: int = INITIAL_LIMIT, min_limit: int = MIN_LIMIT,
+                 max_limit: int = MAX_LIMIT, latency_target: float = LATENCY_TARGET):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._in_flight = 0
+        self._queue = FairQueue()
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self, timeout: float = None, priority: str = DEFAULT_PRIORITY, user: str = "", cost: int = 1):
+        """
+        Wait for a free slot; raises LimiterTimeout if none frees up in time.
+        cost is the call's maxTokens, charged against the user's token quota.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            ticket = self._queue.enqueue(priority, user, cost)
+            while self._in_flight >= self.limit or self._queue.head() is not ticket:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._queue.cancel(ticket)
+                    # The next in line may be admissible now that we're out of the way
+                    self._cond.notify_all()
+                    raise LimiterTimeout("Timed out waiting for a Bedrock slot")
+                self._cond.wait(remaining)
+            self._queue.grant(ticket)
+            self._in_flight += 1
+            # Let the new head check for a slot too
+            self._cond.notify_all()
+
+    def release(self, latency: float = None, throttled: bool = False, failed: bool = False):
+        """Free a slot and adjust the limit from the call's outcome"""
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self._limit = max(self.min_limit, self._limit * THROTTLE_BACKOFF)
+            elif latency is not None and latency > self.latency_target:
+                self._limit = max(self.min_limit, self._limit * LATENCY_BACKOFF)
+            elif latency is not None and not failed:
+                self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._queue),
+                "queue": self._queue.stats()
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> AdaptiveLimiter:
+    """Return the process-wide Bedrock limiter"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = AdaptiveLimiter()
+    return _limiter
+
+
+# -------------------------------
+# RETRY WITH JITTERED BACKOFF
+# -------------------------------
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * (2 ** attempt)))
+
+
+def send_with_backoff(send, limiter: AdaptiveLimiter = None, budget: float = RETRY_BUDGET_SECONDS,
+                      max_attempts: int = MAX_ATTEMPTS, priority: str = DEFAULT_PRIORITY, user: str = "",
+                      cost: int = 1):
+    """
+    Run send() under the limiter, retrying errors marked retryable (see the
+    provider error taxonomy: throttling, transient 5xx / network failures)
+    with jittered backoff while the time budget lasts. Returns send()'s
+    result; re-raises the last error once the budget or attempts run out.
+    priority, user and cost decide the call's place in the limiter's queue.
+    """
+    limiter = limiter or get_limiter()
+    deadline = time.monotonic() + budget
+
+    for attempt in range(max_attempts):
+        limiter.acquire(timeout=max(0.0, deadline - time.monotonic()), priority=priority, user=user, cost=cost)
+        started = time.monotonic()
+        try:
+            result = send()
+        except Exception as e:
+            limiter.release(throttled=getattr(e, "throttled", False), failed=True)
+            delay = backoff_delay(attempt)
+            if (not getattr(e, "retryable", False) or attempt + 1 >= max_attempts
+                    or time.monotonic() + delay >= deadline):
+                raise
+            time.sleep(delay)
+            continue
+
+        limiter.release(latency=time.monotonic() - started)
+        return result
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+
+import requests
+
+from utils.bedrock_client import get_session
+from utils.content_pipeline import save_generation
+from utils.deadline import ACTION_BUDGETS, Deadline
+from utils.scheduler import current_scheduling
+
+# -------------------------------
+# CONTENT API CONFIG
+# -------------------------------
+# Base URL of the backend's content API (Auth_Backend/routes/content.py).
+# Empty (default): the pipeline runs in this process with its own Bedrock key.
+CONTENT_API_URL = os.getenv("CONTENT_API_URL", "").rstrip("/")
+# Extra seconds on top of the action's budget before giving up on the API
+API_GRACE_SECONDS = 5
+
+
+class ContentAPIError(Exception):
+    """A content API failure; error_type is the backend's exception name"""
+
+    def __init__(self, message: str, error_type: str = "ContentAPIError", status: int = None):
+        super().__init__(message)
+        self.error_type = error_type
+        self.status = status
+
+
+# Session JWTs by user email, kept in memory only (never in jobs.db).
+# The page refreshes its user's token on every run.
+_tokens = {}
+_tokens_lock = threading.Lock()
+
+
+def set_token(email: str, token: str):
+    with _tokens_lock:
+        _tokens[email] = token
+
+
+def _headers() -> dict:
+    # Job handlers run under the job owner's scheduling context
+    _, owner = current_scheduling()
+    with _tokens_lock:
+        token = _tokens.get(owner)
+    if not token:
+        raise ContentAPIError("No session token for this user - please log in again", "AuthError", 401)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _raise_for(response):
+    try:
+        body = response.json()
+    except ValueError:
+        body = {}
+    error_type = body.get("error_type") or ("AuthError" if response.status_code in (401, 403) else "ContentAPIError")
+    raise ContentAPIError(body.get("detail") or f"Content API returned {response.status_code}", error_type,
+                          response.status_code)
+
+
+def _post(path: str, body: dict, action: str, stream: bool = False):
+    try:
+        # Shared keep-alive pool (utils/bedrock_client.py): no new TLS handshake per call
+        response = get_session().post(f"{CONTENT_API_URL}{path}", json=body, headers=_headers(), stream=stream,
+                                      timeout=(5, ACTION_BUDGETS[action] + API_GRACE_SECONDS))
+    except requests.Timeout as e:
+        raise ContentAPIError(str(e), "TimeoutError") from e
+    except requests.RequestException as e:
+        raise ContentAPIError(str(e), "ConnectionError") from e
+    if response.status_code != 200:
+        _raise_for(response)
+    return response
+
+
+def iter_sse(response):
+    """(event, data) pairs from a text/event-stream response"""
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+
+
+# -------------------------------
+# REMOTE JOB HANDLERS
+# -------------------------------
+# Same params and results as the local handlers in utils/content_pipeline.py,
+# so the page doesn't care where the pipeline runs.
+
+def run_remote_prompts_job(params: dict, report):
+    return _post("/prompts", {"idea": params["idea"]}, "prompts").json()["prompts"]
+
+
+def run_remote_generation_job(params: dict, report):
+    """Stream the generation from the API, then save it to this app's history"""
+    body = {
+        "selected_prompt": params["title"],
+        "content_type": params["content_type"],
+        "tone": params["tone"],
+        "audience": params["audience"],
+        "purpose": params["purpose"],
+        "word_limit": params["word_limit"],
+        "use_cache": params["use_cache"]
+    }
+    shown = ""
+    content = None
+    with _post("/generate", body, "generation", stream=True) as response:
+        for event, data in iter_sse(response):
+            if event == "delta":
+                shown += data["text"]
+                report(shown)
+            elif event == "done":
+                content = data["content"]
+            elif event == "error":
+                raise ContentAPIError(data.get("detail", "Generation failed"), data.get("error_type", "ContentAPIError"))
+    if content is None:
+        raise ContentAPIError("The generation stream ended early", "ConnectionError")
+    save_generation(params, content, Deadline.for_action("generation"))
+    return content
+
+
+def run_remote_evaluation_job(params: dict, report):
+    body = {key: params[key] for key in ("content", "content_type", "tone", "audience", "purpose", "word_limit")}
+    return _post("/evaluate", body, "evaluation").json()["scores"]
+
+
+def register_remote_jobs(queue):
+    """Register job kinds that call the content API instead of Bedrock"""
+    queue.register("prompts", run_remote_prompts_job, priority="prompts")
+    queue.register("generation", run_remote_generation_job, priority="interactive")
+    queue.register("evaluation", run_remote_evaluation_job, priority="evaluation")
@@ -0,0 +1,542 @@
+import time
+
+from Auth_Backend.database import SessionLocal, engine
+from Auth_Backend.models import ContentHistory
+from utils.bedrock_client import read_timeout_for
+from utils.text_cleaning import clean_model_output, StreamingCleaner
+from utils.llm_cache import get_cache, make_cache_key
+from utils.singleflight import get_group
+from utils.concurrency import get_limiter, send_with_backoff, ThrottledError, LimiterTimeout, RETRY_BUDGET_SECONDS
+from utils.deadline import Deadline, remaining_or
+from utils.hedging import get_hedger
+from utils.circuit_breaker import get_breaker, CircuitOpenError
+from utils.quality_scorer import score_content, METRICS
+from utils.structured_output import parse_structured, SchemaError
+from utils.token_budget import get_token_budget, is_truncated
+from utils.scheduler import current_scheduling
+from utils.model_router import get_router
+from utils.providers import get_provider, Completion, ProviderError, ProviderUnavailable, ProviderRequestError
+
+
+# -------------------------------
+# CONTENT PIPELINE
+# -------------------------------
+# Prompt refinement, generation, evaluation and saving, with no Streamlit in
+# sight: the job handlers run on worker threads (utils/jobs.py) and the
+# benchmarks drive the same functions directly. Failures are raised (or,
+# for the "best effort" helpers, logged and returned as None).
+# The provider is whatever get_provider() was first configured with - the
+# page passes its Bedrock key on startup.
+
+# Expected JSON shapes for structured model output
+PROMPTS_SCHEMA = {
+    "prompt1": {"title": str, "prompt": str},
+    "prompt2": {"title": str, "prompt": str}
+}
+PROMPTS_EXAMPLE = '{"prompt1": {"title": "...", "prompt": "..."}, "prompt2": {"title": "...", "prompt": "..."}}'
+EVALUATION_SCHEMA = {metric: (int, float) for metric in METRICS}
+EVALUATION_EXAMPLE = '{"clarity": 85, "engagement": 78, "tone_consistency": 92, "audience_relevance": 88, "professionalism": 90}'
+
+
+# -------------------------------
+# DATABASE
+# -------------------------------
+def save_to_database(email, title, content_type, tone, audience, purpose, word_limit, content, deadline=None):
+    """Save generated content to database"""
+    connection = db = None
+    previous_busy_ms = None
+    try:
+        # One pinned pooled connection, so the busy_timeout set below is restored on the same one
+        connection = engine.connect()
+        if deadline is not None:
+            # Don't wait on a locked SQLite file past the action's budget (floor of 1s so the save still lands)
+            previous_busy_ms = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            busy_ms = int(max(1.0, deadline.remaining()) * 1000)
+            connection.exec_driver_sql(f"PRAGMA busy_timeout = {busy_ms}")
+            # End the implicit transaction so the session below owns (and commits) its own
+            connection.commit()
+        db = SessionLocal(bind=connection)
+        history = ContentHistory(
+            user_email=email,
+            title=title[:60],
+            content_type=content_type,
+            tone=tone,
+            audience=audience,
+            purpose=purpose,
+            word_limit=word_limit,
+            generated_content=content
+        )
+        db.add(history)
+        db.commit()
+        return True
+    except Exception as e:
+        if db is not None:
+            db.rollback()
+        print(f"Save error: {str(e)}")
+        return False
+    finally:
+        if db is not None:
+            db.close()
+        if previous_busy_ms is not None:
+            try:
+                connection.exec_driver_sql(f"PRAGMA busy_timeout = {int(previous_busy_ms)}")
+                connection.commit()
+            except Exception as e:
+                print(f"Couldn't restore busy_timeout: {str(e)}")
+        if connection is not None:
+            connection.close()
+
+
+# -------------------------------
+# LLM CALLS
+# -------------------------------
+def bedrock_payload(prompt: str, max_tokens: int, temperature: float, prefill: str = None) -> dict:
+    """Nova request body; prefill is a partial assistant reply for the model to continue"""
+    messages = [{"role": "user", "content": [{"text": prompt}]}]
+    if prefill:
+        messages.append({"role": "assistant", "content": [{"text": prefill}]})
+    return {
+        "messages": messages,
+        "inferenceConfig": {"maxTokens": max_tokens, "temperature": temperature}
+    }
+
+
+def forget_response(prompt: str, max_tokens: int, temperature: float):
+    """Drop a cached response that turned out to be unusable, so a retry really re-asks"""
+    get_cache().delete(make_cache_key(bedrock_payload(prompt, max_tokens, temperature)))
+
+
+def remember_response(prompt: str, max_tokens: int, temperature: float, text: str):
+    """Cache the final text for a prompt (e.g. a truncated reply after its continuation)"""
+    get_cache().set(make_cache_key(bedrock_payload(prompt, max_tokens, temperature)), text)
+
+
+def repair_with_bedrock(max_tokens: int, deadline: Deadline = None):
+    """One cheap, deterministic repair call for malformed structured output"""
+    return lambda repair_prompt: call_bedrock_api(repair_prompt, max_tokens, 0.0, deadline=deadline, site="repair")
+
+
+def is_outage(error: Exception) -> bool:
+    """
+    Whether a failed call says the provider is unhealthy (and should trip the
+    breaker): server, network and timeout errors from the provider. Waiting
+    out our own limiter queue or deadline, and rejected (4xx) requests, don't.
+    """
+    return isinstance(error, ProviderError) and not isinstance(error, ProviderRequestError)
+
+
+def invoke_bedrock(prompt: str, max_tokens: int = 500, temperature: float = 0.7, use_cache: bool = True,
+                   deadline: Deadline = None, hedge: str = None, prefill: str = None, site: str = None):
+    """
+    LLM call without any UI, safe to run off the script thread. Goes to the
+    configured provider (Bedrock, or the local stand-in with LLM_PROVIDER=local).
+    site picks the model route (defaults to the hedge site, else generation).
+    Returns a Completion (text, stop_reason, usage) - stop_reason/usage are
+    None for cached replies - or None if the request was rejected. Raises on failure.
+    """
+    payload = bedrock_payload(prompt, max_tokens, temperature, prefill)
+    
+    cache = get_cache()
+    cache_key = make_cache_key(payload)
+    if use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Completion(cached)
+    
+    # Captured here: hedged attempts run on other threads
+    priority, user = current_scheduling()
+    router = get_router()
+    provider = get_provider()
+    
+    def send_to(tier: str, budget: float):
+        # Runs under the process-wide AIMD limiter (priority / fair-share queue), retrying retryable errors with jittered backoff
+        started = time.monotonic()
+        try:
+            completion = send_with_backoff(
+                lambda: provider.complete(payload, tier, remaining_or(deadline, read_timeout_for(max_tokens))),
+                budget=budget,
+                priority=priority,
+                user=user,
+                cost=max_tokens
+            )
+        except (LimiterTimeout, ProviderRequestError):
+            # Our own queue was full, or the request itself was bad - says nothing about the tier
+            raise
+        except Exception as e:
+            router.record(tier, throttled=isinstance(e, ThrottledError), failed=True)
+            raise
+        router.record(tier, latency=time.monotonic() - started)
+        return completion
+    
+    def send():
+        # Best tier first; a throttled or failing tier hands over to the next with its share of the budget
+        tiers = router.route(site or hedge, max_tokens)
+        budget = remaining_or(deadline, RETRY_BUDGET_SECONDS)
+        started = time.monotonic()
+        for i, tier in enumerate(tiers):
+            left = max(0.0, budget - (time.monotonic() - started))
+            last = i == len(tiers) - 1
+            try:
+                return send_to(tier, left if last else left / (len(tiers) - i))
+            except (ThrottledError, ProviderUnavailable) as e:
+                if last or isinstance(e, LimiterTimeout):
+                    raise
+    
+    def checked():
+        # A rejected request (4xx) is our bug, not an outage: don't let it trip the breaker
+        try:
+            if hedge:
+                return get_hedger().run(hedge, send, timeout=deadline.remaining() if deadline else None)
+            return send()
+        except ProviderRequestError as e:
+            print(f"{provider.name} rejected the request: {e}")
+            return None
+    
+    def fetch():
+        # Fails fast while the backend is degraded instead of waiting out every timeout
+        completion = get_breaker().call(checked, is_failure_error=is_outage)
+        # A hit carries no stop_reason, so a reply cut off at maxTokens is only
+        # cached once continued (generate_content calls remember_response)
+        if completion is not None and not is_truncated(completion.stop_reason):
+            cache.set(cache_key, completion.text)
+        return completion
+    
+    try:
+        if not use_cache:
+            return fetch()
+        # Identical requests already in flight (other sessions, double-clicks) share one call
+        return get_group("bedrock").do(cache_key, fetch, timeout=deadline.remaining() if deadline else None)
+    except CircuitOpenError:
+        stale = cache.get(cache_key, allow_stale=True)
+        if stale is not None:
+            return Completion(stale)
+        raise
+
+
+def call_bedrock_api(prompt: str, max_tokens: int = 500, temperature: float = 0.7, use_cache: bool = True,
+                     deadline: Deadline = None, hedge: str = None, prefill: str = None, result: dict = None,
+                     site: str = None):
+    """
+    Call Bedrock API (use_cache=False forces a fresh sample but still refreshes the cache).
+    With a deadline, timeouts and retries come out of the action's remaining budget.
+    hedge names the call site for hedged requests - only pass it for short, idempotent calls.
+    site picks the model route when it differs from hedge.
+    If result is given, Bedrock's stop_reason and usage are recorded in it.
+    Never raises: failures are logged and come back as None.
+    """
+    try:
+        fetched = invoke_bedrock(prompt, max_tokens, temperature, use_cache, deadline, hedge, prefill, site)
+        if fetched is None:
+            return None
+        text, stop_reason, usage = fetched
+        if result is not None:
+            result["stop_reason"] = stop_reason
+            result["usage"] = usage
+        return text
+    except Exception as e:
+        print(f"Bedrock call failed ({type(e).__name__}): {e}")
+    return None
+
+
+def stream_bedrock_api(prompt: str, max_tokens: int = 500, temperature: float = 0.7, use_cache: bool = True,
+                       deadline: Deadline = None, result: dict = None):
+    """
+    Stream a reply from the configured provider and yield text as it arrives.
+    If result is given, the stream's stop_reason and usage are recorded in it.
+    """
+    result = result if result is not None else {}
+    payload = bedrock_payload(prompt, max_tokens, temperature)
+    
+    cache = get_cache()
+    cache_key = make_cache_key(payload)
+    if use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    
+    breaker = get_breaker()
+    if not breaker.allow():
+        raise CircuitOpenError("Circuit open: AI service unavailable")
+    
+    parts = []
+    router = get_router()
+    provider = get_provider()
+    # A stream can't fail over mid-way; on failure the caller falls back to the routed blocking call
+    tier = router.route("generation", max_tokens)[0]
+    limiter = get_limiter()
+    priority, user = current_scheduling()
+    reported = False
+    try:
+        limiter.acquire(timeout=deadline.remaining() if deadline else None, priority=priority, user=user,
+                        cost=max_tokens)
+        throttled = False
+        try:
+            timeout = remaining_or(deadline, read_timeout_for(max_tokens))
+            for delta in provider.stream(payload, tier, timeout, result):
+                if deadline is not None:
+                    deadline.check("next stream chunk")
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            throttled = isinstance(e, ThrottledError)
+            if is_outage(e):
+                breaker.record_failure()
+                reported = True
+                router.record(tier, throttled=throttled, failed=True)
+            raise
+        finally:
+            # Stream duration depends on output length, so only throttling feeds back into the limit
+            limiter.release(throttled=throttled)
+        breaker.record_success()
+        reported = True
+        router.record(tier)
+    finally:
+        # Queue timeouts, expired deadlines, bad requests and abandoned streams give back a half-open trial
+        if not reported:
+            breaker.release()
+    if parts and not is_truncated(result.get("stop_reason")):
+        cache.set(cache_key, "".join(parts))
+
+
+def generate_streaming(prompt: str, max_tokens: int, on_text, use_cache: bool = True, deadline: Deadline = None,
+                       result: dict = None):
+    """
+    Pass the cleaned text so far to on_text as it streams; returns the raw text.
+    A stream that breaks off after producing text returns what it has, with
+    result["stop_reason"] marked truncated (and result["interrupted"] set) so
+    the caller finishes it rather than keeping a cut-off draft.
+    """
+    result = result if result is not None else {}
+    cleaner = StreamingCleaner()
+    raw_parts = []
+    shown = ""
+    try:
+        for delta in stream_bedrock_api(prompt, max_tokens, 0.7, use_cache, deadline, result):
+            raw_parts.append(delta)
+            shown += cleaner.feed(delta)
+            if shown:
+                on_text(shown)
+        shown += cleaner.finish()
+    except Exception as e:
+        if not raw_parts:
+            # Nothing produced yet - let the caller fall back to a blocking call
+            print(f"Streaming failed, falling back: {e}")
+            return None
+        print(f"Streaming stopped early, continuing from the partial output: {e}")
+        result["stop_reason"] = "max_tokens"
+        result["interrupted"] = True
+    return "".join(raw_parts) or None
+
+
+def build_generation_prompt(content_type: str, tone: str, audience: str, purpose: str, word_limit: int,
+                            selected_prompt: str) -> str:
+    return f"""Write a {tone} {content_type} in approximately {word_limit} words.
+Audience: {audience}
+Purpose: {purpose}
+Content: {selected_prompt}
+
+Create engaging, authentic content that resonates with the target audience."""
+
+
+def continue_generation(prompt: str, text: str, content_type: str, word_limit: int, deadline: Deadline = None,
+                        max_continuations: int = 2):
+    """
+    Finish a reply that stopped at maxTokens by asking only for the rest
+    (the partial text is sent back as an assistant prefill), not a full redo.
+    Returns the completed text.
+    """
+    budget = get_token_budget()
+    for _ in range(max_continuations):
+        if deadline is not None and deadline.expired:
+            break
+        partial = text.rstrip()
+        result = {}
+        more = call_bedrock_api(
+            prompt,
+            budget.continuation_tokens(content_type, word_limit, partial),
+            0.7,
+            deadline=deadline,
+            prefill=partial,
+            result=result
+        )
+        if not more:
+            break
+        text = partial + more
+        if not is_truncated(result.get("stop_reason")):
+            break
+    return text
+
+
+def evaluate_content(content: str, content_type: str, tone: str, audience: str, purpose: str,
+                     deadline: Deadline = None, mode: str = "llm", word_limit: int = None):
+    """Evaluate content quality and return scores (mode "local" skips Bedrock entirely)"""
+    if mode == "local" or get_breaker().is_open:
+        # Local scorer: instant, and the fallback while Bedrock is down
+        return score_content(content, content_type, tone, audience, word_limit)
+    
+    key = make_cache_key({"messages": [content, content_type, tone, audience, purpose, word_limit]})
+    try:
+        scores = get_group("evaluation").do(
+            key,
+            lambda: _evaluate_content(content, content_type, tone, audience, purpose, deadline, word_limit),
+            timeout=deadline.remaining() if deadline else None
+        )
+    except TimeoutError:
+        return None
+    # Each session gets its own copy of a shared result
+    return dict(scores) if scores else scores
+
+
+def _evaluate_content(content: str, content_type: str, tone: str, audience: str, purpose: str,
+                      deadline: Deadline = None, word_limit: int = None):
+    evaluation_prompt = f"""Analyze this {content_type} and provide quality scores (0-100) for each criterion.
+
+Content to evaluate:
+{content}
+
+Expected characteristics:
+- Tone: {tone}
+- Audience: {audience}
+- Purpose: {purpose}
+
+Provide scores in this exact JSON format:
+{{
+    "clarity": 85,
+    "engagement": 78,
+    "tone_consistency": 92,
+    "audience_relevance": 88,
+    "professionalism": 90
+}}
+
+Only return the JSON, no other text."""
+    
+    response = call_bedrock_api(evaluation_prompt, 300, 0.3, deadline=deadline, hedge="evaluation")
+    
+    if response:
+        parsed = parse_structured(
+            clean_model_output(response),
+            EVALUATION_SCHEMA,
+            "evaluation",
+            repair=repair_with_bedrock(120, deadline),
+            example=EVALUATION_EXAMPLE
+        )
+        if parsed is None:
+            forget_response(evaluation_prompt, 300, 0.3)
+            return score_content(content, content_type, tone, audience, word_limit)
+        
+        scores = {metric: int(max(0, min(100, parsed[metric]))) for metric in METRICS}
+        scores["overall"] = int(sum(scores.values()) / len(scores))
+        return scores
+    
+    if get_breaker().is_open:
+        return score_content(content, content_type, tone, audience, word_limit)
+    return None
+
+
+# -------------------------------
+# JOB HANDLERS
+# -------------------------------
+# Handlers only see their params (no session state) and report failures by raising.
+
+def prompts_request(idea: str) -> str:
+    return f"""Generate 2 different refined prompts from: "{idea}"
+Return JSON: {{"prompt1": {{"title": "...", "prompt": "..."}}, "prompt2": {{"title": "...", "prompt": "..."}}}}"""
+
+
+def run_prompts_job(params: dict, report):
+    """Two refined prompts for the user's idea"""
+    deadline = Deadline.for_action("prompts")
+    prompt = prompts_request(params["idea"])
+    fetched = invoke_bedrock(prompt, 800, 0.8, deadline=deadline, hedge="prompts")
+    if fetched is None:
+        raise ConnectionError("Bedrock returned an error response")
+    
+    # Local recovery first, then at most one small repair call - never a full regeneration
+    prompts_data = parse_structured(
+        clean_model_output(fetched[0]),
+        PROMPTS_SCHEMA,
+        "prompts",
+        repair=repair_with_bedrock(400, deadline),
+        example=PROMPTS_EXAMPLE
+    )
+    if prompts_data is None:
+        forget_response(prompt, 800, 0.8)
+        raise SchemaError("Prompt suggestions were not valid JSON")
+    return [prompts_data["prompt1"], prompts_data["prompt2"]]
+
+
+def generate_content(params: dict, report, deadline: Deadline = None) -> str:
+    """Generate content (streamed into report) and finish it if truncated; returns the cleaned text"""
+    deadline = deadline or Deadline.for_action("generation")
+    prompt = params["prompt"]
+    max_tokens = params["max_tokens"]
+    use_cache = params["use_cache"]
+    content_type = params["content_type"]
+    word_limit = params["word_limit"]
+    
+    result = {}
+    content = None
+    if params["stream"]:
+        content = generate_streaming(prompt, max_tokens, report, use_cache, deadline, result)
+    if not content:
+        deadline.check("generation")
+        fetched = invoke_bedrock(prompt, max_tokens, 0.7, use_cache, deadline)
+        if fetched is None:
+            raise ConnectionError("Bedrock returned an error response")
+        content, result["stop_reason"], result["usage"] = fetched
+    
+    get_token_budget().observe(content_type, content, result.get("usage"))
+    if is_truncated(result.get("stop_reason")):
+        partial = content
+        content = continue_generation(prompt, content, content_type, word_limit, deadline)
+        if result.get("interrupted") and content == partial:
+            # Never hand a broken-off stream back as a finished draft
+            raise ConnectionError("The generation stream broke off and could not be finished")
+        # Serve the completed text, not the cut-off one, on the next cache hit
+        remember_response(prompt, max_tokens, 0.7, content)
+    
+    return clean_model_output(content)
+
+
+def save_generation(params: dict, final_content: str, deadline: Deadline = None):
+    """Save a finished generation to the user's history"""
+    return save_to_database(
+        params["email"],
+        params["title"],
+        params["content_type"],
+        params["tone"],
+        params["audience"],
+        params["purpose"],
+        params["word_limit"],
+        final_content,
+        deadline
+    )
+
+
+def run_generation_job(params: dict, report):
+    """Generate content (streamed into report), finish it if truncated, and save it to history"""
+    deadline = Deadline.for_action("generation")
+    final_content = generate_content(params, report, deadline)
+    save_generation(params, final_content, deadline)
+    return final_content
+
+
+def run_evaluation_job(params: dict, report):
+    """AI quality scores for a piece of content"""
+    return evaluate_content(
+        params["content"],
+        params["content_type"],
+        params["tone"],
+        params["audience"],
+        params["purpose"],
+        Deadline.for_action("evaluation"),
+        word_limit=params["word_limit"]
+    )
+
+
+def register_jobs(queue):
+    """Register the pipeline's job kinds (and their scheduling priority) on a job queue"""
+    queue.register("prompts", run_prompts_job, priority="prompts")
+    queue.register("generation", run_generation_job, priority="interactive")
+    queue.register("evaluation", run_evaluation_job, priority="evaluation")
@@ -0,0 +1,54 @@
+import os
+import time
+
+# -------------------------------
+# END-TO-END BUDGETS PER USER ACTION
+# -------------------------------
+ACTION_BUDGETS = {
+    "prompts": float(os.getenv("DEADLINE_PROMPTS_SECONDS", "30")),
+    "generation": float(os.getenv("DEADLINE_GENERATION_SECONDS", "60")),
+    "evaluation": float(os.getenv("DEADLINE_EVALUATION_SECONDS", "20")),
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    """The user action ran out of its end-to-end time budget"""
+
+
+class Deadline:
+    """
+    Absolute expiry for one user action (e.g. "Generate Prompts").
+    Create it when the action starts and pass it down; every timeout and
+    retry budget underneath is taken from what is left.
+    """
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_action(cls, action: str) -> "Deadline":
+        return cls(ACTION_BUDGETS[action])
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, what: str = "request"):
+        """Raise DeadlineExceeded if the budget is spent"""
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+    def timeout(self, cap: float = None) -> float:
+        """Timeout for the next blocking step: what is left, never more than cap"""
+        self.check()
+        remaining = self.remaining()
+        return remaining if cap is None else min(cap, remaining)
+
+
+def remaining_or(deadline: Deadline, default: float) -> float:
+    """Remaining budget if a deadline is given, else the default"""
+    return default if deadline is None else deadline.timeout(default)
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from utils.bedrock_client import POOL_MAXSIZE
+
+# -------------------------------
+# HEDGING CONFIG
+# -------------------------------
+# Fire the duplicate once a call is slower than this percentile of recent calls
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+# At most this fraction of calls may be hedged (keeps the extra cost bounded)
+MAX_HEDGE_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+# Until we have enough samples, hedge after a fixed delay
+MIN_SAMPLES = 20
+DEFAULT_HEDGE_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "3"))
+WINDOW_SIZE = 200
+# Threads running hedged calls: room for a primary and a hedge per pooled
+# Bedrock connection, so calls don't sit queued behind this pool
+HEDGE_WORKERS = int(os.getenv("HEDGE_WORKERS", str(2 * POOL_MAXSIZE)))
+
+
+class LatencyWindow:
+    """Rolling window of recent latencies for one call site"""
+
+    def __init__(self, size: int = WINDOW_SIZE):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float):
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(p * len(ordered)))
+        return ordered[index]
+
+
+class Hedger:
+    """
+    Hedged requests for short, idempotent calls: if the primary has not
+    returned by the adaptive percentile delay, start one duplicate and use
+    whichever succeeds first. The loser is left to finish in the background.
+    The delay counts from when the primary starts running, not from when it
+    was queued, so a busy pool is not mistaken for a slow call.
+    """
+
+    def __init__(self, percentile: float = HEDGE_PERCENTILE, max_ratio: float = MAX_HEDGE_RATIO,
+                 workers: int = HEDGE_WORKERS):
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self._windows = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge")
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _window(self, site: str) -> LatencyWindow:
+        with self._lock:
+            if site not in self._windows:
+                self._windows[site] = LatencyWindow()
+            return self._windows[site]
+
+    def hedge_delay(self, site: str) -> float:
+        delay = self._window(site).percentile(self.percentile)
+        return DEFAULT_HEDGE_DELAY if delay is None else delay
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.max_ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def _timed(self, fn, site: str, running: threading.Event = None):
+        if running is not None:
+            running.set()
+        started = time.monotonic()
+        result = fn()
+        self._window(site).record(time.monotonic() - started)
+        return result
+
+    def run(self, site: str, fn, timeout: float = None):
+        """Run fn with hedging; timeout bounds the total wait (TimeoutError)"""
+        with self._lock:
+            self.calls += 1
+        started = time.monotonic()
+
+        running = threading.Event()
+        primary = self._executor.submit(self._timed, fn, site, running)
+        # A primary still queued for a thread isn't slow; a hedge would only queue behind it
+        if not running.wait(self._bounded(None, started, timeout)):
+            primary.cancel()
+            raise TimeoutError("Hedged call timed out")
+        done, _ = wait([primary], timeout=self._bounded(self.hedge_delay(site), started, timeout))
+        if done:
+            return primary.result()
+
+        pending = {primary}
+        hedge = None
+        if self._may_hedge():
+            hedge = self._executor.submit(self._timed, fn, site)
+            pending.add(hedge)
+
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=self._bounded(None, started, timeout),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError("Hedged call timed out")
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    @staticmethod
+    def _bounded(delay, started: float, timeout):
+        if timeout is None:
+            return delay
+        remaining = max(0.0, timeout - (time.monotonic() - started))
+        return remaining if delay is None else min(delay, remaining)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_ratio": round(self.hedges / self.calls, 3) if self.calls else 0.0,
+                "hedge_win_rate": round(self.hedge_wins / self.hedges, 3) if self.hedges else 0.0
+            }
+
+
+_hedger = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    """Return the process-wide hedger"""
+    global _hedger
+    if _hedger is None:
+        with _hedger_lock:
+            if _hedger is None:
+                _hedger = Hedger()
+    return _hedger
@@ -0,0 +1,294 @@
+import html
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, func, text, select, table, column, literal_column
+
+from Auth_Backend import database
+from Auth_Backend.database import SessionLocal, upgrade_db
+from Auth_Backend.models import ContentHistory
+
+# -------------------------------
+# HISTORY CONFIG
+# -------------------------------
+# Drafts fetched per "Load more"
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def _ensure_schema():
+    """Bring an existing users.db up to date once per process (indexes etc.)"""
+    global _schema_ready
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                upgrade_db()
+                _schema_ready = True
+
+
+# -------------------------------
+# SUMMARY RECORDS
+# -------------------------------
+class HistorySummary:
+    """
+    What the draft list shows, without the generated text: a plain slotted
+    record instead of an ORM instance, so a page of summaries is a few KB.
+    The body is fetched by id (get_history_content) only when needed.
+    """
+    __slots__ = ("id", "title", "content_type", "tone", "audience", "purpose", "word_limit", "created_at")
+
+    def __init__(self, id, title, content_type, tone, audience, purpose, word_limit, created_at):
+        self.id = id
+        self.title = title
+        self.content_type = content_type
+        self.tone = tone
+        self.audience = audience
+        self.purpose = purpose
+        self.word_limit = word_limit
+        self.created_at = created_at
+
+    def __repr__(self):
+        return f"HistorySummary(id={self.id!r}, title={self.title!r})"
+
+
+class SearchResult(HistorySummary):
+    """A HistorySummary matched by full-text search, with its rank and a snippet"""
+    __slots__ = ("snippet", "score")
+
+    def __init__(self, id, title, content_type, tone, audience, purpose, word_limit, created_at, snippet, score):
+        super().__init__(id, title, content_type, tone, audience, purpose, word_limit, created_at)
+        self.snippet = snippet
+        self.score = score
+
+
+# Projected columns, in HistorySummary's argument order
+SUMMARY_COLUMNS = [getattr(ContentHistory, name) for name in HistorySummary.__slots__]
+
+
+# -------------------------------
+# FILTERS
+# -------------------------------
+# Columns Saved Drafts can be narrowed by. Each has an index on
+# (user_email, <facet>, created_at, id), so its counts are index-only.
+FACETS = ("content_type", "tone", "audience", "purpose")
+
+# filters is a dict; missing or empty entries don't restrict anything:
+#   {"content_type": ["Blog Post"], "tone": [...], "audience": [...], "purpose": [...],
+#    "created_from": date, "created_to": date}   (both dates inclusive)
+
+
+def filters_active(filters: dict) -> bool:
+    return bool(filters) and any(filters.get(key) for key in FACETS + ("created_from", "created_to"))
+
+
+def _filter_conditions(filters: dict, skip: str = None) -> list:
+    """SQL conditions for filters, leaving out the skip facet"""
+    filters = filters or {}
+    conditions = []
+    for facet in FACETS:
+        values = filters.get(facet)
+        if values and facet != skip:
+            conditions.append(getattr(ContentHistory, facet).in_(list(values)))
+    if filters.get("created_from"):
+        conditions.append(ContentHistory.created_at >= datetime.combine(filters["created_from"], datetime.min.time()))
+    if filters.get("created_to"):
+        day_after = filters["created_to"] + timedelta(days=1)
+        conditions.append(ContentHistory.created_at < datetime.combine(day_after, datetime.min.time()))
+    return conditions
+
+
+# -------------------------------
+# KEYSET PAGINATION
+# -------------------------------
+# A cursor is the (created_at, id) of the last draft already shown; the next
+# page is everything strictly after it in (created_at DESC, id DESC) order.
+# That is one index range scan on ix_content_history_user_created_id (or on
+# a facet index when filtering on one value), so a page costs the same at
+# draft 20 as at draft 20,000 (OFFSET would not).
+
+def cursor_for(item) -> tuple:
+    """Cursor pointing just past item (JSON-friendly: ISO timestamp, id)"""
+    return (item.created_at.isoformat(), item.id)
+
+
+def get_history_page(email: str, limit: int = HISTORY_PAGE_SIZE, cursor: tuple = None, search: str = "",
+                     filters: dict = None):
+    """
+    One page of a user's drafts as HistorySummary records, newest first,
+    narrowed by filters. With a search, returns the best-ranked matches
+    instead (see search_history); without FTS5 it falls back to a
+    case-insensitive substring match.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    _ensure_schema()
+    if search and database.search_available and match_query(search):
+        return search_history(email, search, limit, cursor, filters)
+    db = SessionLocal()
+    try:
+        query = db.query(*SUMMARY_COLUMNS).filter(ContentHistory.user_email == email, *_filter_conditions(filters))
+        if search:
+            query = query.filter(_search_condition(search))
+        if cursor is not None:
+            created_at, last_id = datetime.fromisoformat(cursor[0]), cursor[1]
+            query = query.filter(or_(
+                ContentHistory.created_at < created_at,
+                and_(ContentHistory.created_at == created_at, ContentHistory.id < last_id)
+            ))
+        # One extra row tells us whether another page exists
+        rows = (
+            query.order_by(ContentHistory.created_at.desc(), ContentHistory.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+    finally:
+        db.close()
+    items = [HistorySummary(*row) for row in rows]
+    if len(items) > limit:
+        return items[:limit], cursor_for(items[limit - 1])
+    return items, None
+
+
+# -------------------------------
+# FULL-TEXT SEARCH
+# -------------------------------
+# Backed by the content_history_fts table (Auth_Backend/database.py). Ranking
+# is bm25 with title hits weighted above body hits, ties broken by id. bm25
+# scores move whenever any draft is added or removed, so a search is ranked
+# once, on its first page, and later pages walk that ranking (the cursor is
+# the ids still to show) instead of re-comparing recomputed float scores.
+SEARCH_WEIGHTS = (5.0, 1.0)  # title, generated_content
+# Ranked matches kept per search; nobody pages past this
+SEARCH_MAX_RESULTS = int(os.getenv("HISTORY_SEARCH_MAX_RESULTS", "1000"))
+SNIPPET_TOKENS = 24
+# Snippet match markers; control characters so they can't occur in drafts
+MARK_START, MARK_END = "\x02", "\x03"
+
+SEARCH_INDEX = table(database.SEARCH_TABLE, column("rowid"))
+SEARCH_SCORE = literal_column(f"bm25({database.SEARCH_TABLE}, {SEARCH_WEIGHTS[0]}, {SEARCH_WEIGHTS[1]})")
+SEARCH_SNIPPET = literal_column(f"snippet({database.SEARCH_TABLE}, -1, char(2), char(3), '…', {SNIPPET_TOKENS})")
+
+
+def match_query(search: str) -> str:
+    """
+    FTS5 query for what the user typed: every word must appear, each as a
+    prefix ("mark" finds "marketing"). Words are quoted, so FTS5 operators
+    and punctuation in the input are never interpreted. "" if no words.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", search))
+
+
+def _match(search: str):
+    return text(f"{database.SEARCH_TABLE} MATCH :match").bindparams(match=match_query(search))
+
+
+def _search_condition(search: str):
+    """Restricts a content_history query to drafts matching search"""
+    if database.search_available and match_query(search):
+        return ContentHistory.id.in_(select(SEARCH_INDEX.c.rowid).where(_match(search)))
+    # Substring match: % and _ typed by the user are literal characters
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    return or_(ContentHistory.title.ilike(pattern, escape="\\"),
+               ContentHistory.generated_content.ilike(pattern, escape="\\"))
+
+
+def search_history(email: str, search: str, limit: int = HISTORY_PAGE_SIZE, cursor: tuple = None,
+                   filters: dict = None):
+    """
+    One page of the user's drafts matching search (and filters), best match
+    first, as SearchResult records. The cursor is the tuple of ranked ids not
+    shown yet. Returns (items, next_cursor) like get_history_page.
+    """
+    if not match_query(search):
+        return [], None
+    _ensure_schema()
+    db = SessionLocal()
+    try:
+        if cursor is None:
+            # Rank every match once, ordered by (score, id); only ids are kept
+            ranked = (
+                db.query(ContentHistory.id)
+                .select_from(SEARCH_INDEX)
+                .join(ContentHistory, ContentHistory.id == SEARCH_INDEX.c.rowid)
+                .filter(_match(search), ContentHistory.user_email == email, *_filter_conditions(filters))
+                .order_by(SEARCH_SCORE, ContentHistory.id)
+                .limit(SEARCH_MAX_RESULTS)
+                .all()
+            )
+            cursor = tuple(row[0] for row in ranked)
+        page_ids = list(cursor[:limit])
+        rows = []
+        if page_ids:
+            rows = (
+                db.query(*SUMMARY_COLUMNS, SEARCH_SNIPPET, SEARCH_SCORE)
+                .select_from(SEARCH_INDEX)
+                .join(ContentHistory, ContentHistory.id == SEARCH_INDEX.c.rowid)
+                .filter(_match(search), ContentHistory.user_email == email, ContentHistory.id.in_(page_ids))
+                .all()
+            )
+    finally:
+        db.close()
+    # Drafts deleted since the search was ranked simply drop out
+    found = {row[0]: SearchResult(*row) for row in rows}
+    items = [found[item_id] for item_id in page_ids if item_id in found]
+    return items, (tuple(cursor[limit:]) or None)
+
+
+def highlight_snippet(snippet: str) -> str:
+    """HTML for a search snippet: escaped text with the matched words in <mark>"""
+    return html.escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def get_history_content(email: str, item_id: int):
+    """The generated text of one of the user's drafts, or None if it doesn't exist"""
+    db = SessionLocal()
+    try:
+        return (
+            db.query(ContentHistory.generated_content)
+            .filter(ContentHistory.id == item_id, ContentHistory.user_email == email)
+            .scalar()
+        )
+    finally:
+        db.close()
+
+
+def count_history(email: str, filters: dict = None, search: str = "") -> int:
+    """Number of a user's drafts, optionally only those matching filters and search"""
+    _ensure_schema()
+    db = SessionLocal()
+    try:
+        query = db.query(func.count(ContentHistory.id)).filter(ContentHistory.user_email == email,
+                                                                *_filter_conditions(filters))
+        if search:
+            query = query.filter(_search_condition(search))
+        return query.scalar()
+    finally:
+        db.close()
+
+
+def facet_counts(email: str, filters: dict = None, search: str = "", facets: tuple = FACETS) -> dict:
+    """
+    {facet: {value: number of drafts}} for the user, largest first, each
+    counted with one GROUP BY. A facet's counts apply every filter except its
+    own, so they say how many drafts picking that value would add or leave.
+    """
+    _ensure_schema()
+    counts = {}
+    db = SessionLocal()
+    try:
+        for facet in facets:
+            facet_column = getattr(ContentHistory, facet)
+            query = db.query(facet_column, func.count(ContentHistory.id)).filter(
+                ContentHistory.user_email == email, facet_column.isnot(None), *_filter_conditions(filters, skip=facet)
+            )
+            if search:
+                query = query.filter(_search_condition(search))
+            rows = query.group_by(facet_column).order_by(func.count(ContentHistory.id).desc(), facet_column).all()
+            counts[facet] = dict(rows)
+    finally:
+        db.close()
+    return counts
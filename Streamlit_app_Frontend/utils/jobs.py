@@ -0,0 +1,201 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.scheduler import scheduling, DEFAULT_PRIORITY
+
+# -------------------------------
+# JOB QUEUE CONFIG
+# -------------------------------
+# Lives next to users.db and llm_cache.db
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "./jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "8"))
+# Finished jobs are kept this long so a reconnecting session can still pick them up
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(24 * 3600)))
+POLL_INTERVAL = 0.2
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+
+class JobQueue:
+    """
+    Bedrock work (generation, evaluation, prompt refinement) runs here on a
+    worker pool instead of in the Streamlit script thread. Jobs and their
+    results are persisted in SQLite, so a rerun, reconnect or tab switch
+    reattaches to the job by id - or by key - instead of starting it again.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH, workers: int = JOB_WORKERS):
+        self.path = path
+        self._handlers = {}   # kind -> (handler, priority)
+        self._progress = {}   # job_id -> latest partial output (in memory only)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                key TEXT,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                error_type TEXT,
+                claimed INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_key ON jobs (key, status)")
+        # Workers from a previous server process are gone; don't leave sessions polling forever
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, error_type = ?, updated_at = ? WHERE status IN (?, ?)",
+            (FAILED, "Interrupted by a server restart", "Interrupted", time.time(), QUEUED, RUNNING)
+        )
+        self._conn.commit()
+
+    def register(self, kind: str, handler, priority: str = DEFAULT_PRIORITY):
+        """
+        handler(params, report) -> JSON-serializable result. report(partial)
+        publishes progress (e.g. streamed text) to anyone polling the job.
+        Bedrock calls made by the handler are scheduled in the given priority
+        class on behalf of the job's owner.
+        Re-registering replaces the handler (page scripts re-run on every rerun).
+        """
+        with self._lock:
+            self._handlers[kind] = (handler, priority)
+
+    def submit(self, kind: str, params: dict, owner: str = "", key: str = None) -> str:
+        """
+        Queue a job and return its id. With a key, a queued, running or
+        finished-but-unclaimed job with the same key is reused instead.
+        """
+        now = time.time()
+        with self._lock:
+            if kind not in self._handlers:
+                raise KeyError(f"No handler registered for job kind '{kind}'")
+            if key is not None:
+                row = self._conn.execute(
+                    """SELECT id FROM jobs
+                       WHERE key = ? AND (status IN (?, ?) OR (status = ? AND claimed = 0))
+                       ORDER BY created_at DESC LIMIT 1""",
+                    (key, QUEUED, RUNNING, DONE)
+                ).fetchone()
+                if row:
+                    return row[0]
+
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                """INSERT INTO jobs (id, kind, owner, key, status, params, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, kind, owner or "", key, QUEUED, json.dumps(params), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, now - JOB_RETENTION_SECONDS)
+            )
+            self._conn.commit()
+
+        self._executor.submit(self._run, job_id, kind, params, owner)
+        return job_id
+
+    def _set(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def _run(self, job_id: str, kind: str, params: dict, owner: str):
+        self._set(job_id, status=RUNNING)
+        with self._lock:
+            handler, priority = self._handlers[kind]
+
+        def report(partial):
+            with self._lock:
+                self._progress[job_id] = partial
+
+        try:
+            with scheduling(priority, owner):
+                result = handler(params, report)
+            self._set(job_id, status=DONE, result=json.dumps(result))
+        except Exception as e:
+            print(f"Job {kind} {job_id} failed: {e}")
+            # Errors relayed from elsewhere (the content API, cassettes) carry their original type name
+            error_type = getattr(e, "error_type", None) or type(e).__name__
+            self._set(job_id, status=FAILED, error=str(e), error_type=error_type)
+        finally:
+            with self._lock:
+                self._progress.pop(job_id, None)
+
+    def status(self, job_id: str):
+        """Job as a dict (status, result, error, progress ...), or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT id, kind, owner, status, result, error, error_type, claimed, created_at, updated_at
+                   FROM jobs WHERE id = ?""",
+                (job_id,)
+            ).fetchone()
+            progress = self._progress.get(job_id)
+        if row is None:
+            return None
+        job = dict(zip(
+            ("id", "kind", "owner", "status", "result", "error", "error_type", "claimed", "created_at", "updated_at"),
+            row
+        ))
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["progress"] = progress
+        return job
+
+    def watch(self, job_id: str, timeout: float = None, interval: float = POLL_INTERVAL):
+        """Yield the job each poll until it finishes (last item) or timeout passes"""
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            yield job
+            if job is None or job["status"] in FINISHED:
+                return
+            if end is not None and time.monotonic() >= end:
+                return
+            time.sleep(interval)
+
+    def wait(self, job_id: str, timeout: float = None):
+        """Block until the job finishes or timeout passes; returns its latest state"""
+        job = None
+        for job in self.watch(job_id, timeout):
+            pass
+        return job
+
+    def claim(self, job_id: str):
+        """Mark a finished job's result as delivered, so its key no longer reattaches to it"""
+        self._set(job_id, claimed=1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
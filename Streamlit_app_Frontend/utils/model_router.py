@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from collections import deque
+
+from utils.hedging import LatencyWindow
+from utils.providers.base import TIERS
+
+# -------------------------------
+# MODEL ROUTING CONFIG
+# -------------------------------
+# Tiers (micro / lite / pro) are mapped to concrete models by the provider.
+# Call site -> tiers in order of preference (later tiers are failovers).
+# Short structured calls stay on micro; long-form generation earns a larger tier.
+ROUTES = {
+    "prompts": ["micro", "lite"],
+    "evaluation": ["micro", "lite"],
+    "repair": ["micro", "lite"],
+    "generation": ["micro", "lite"],
+    "long_form": ["lite", "micro"],
+}
+DEFAULT_SITE = "generation"
+# Generations asking for at least this many tokens count as long-form
+LONG_FORM_TOKENS = int(os.getenv("ROUTER_LONG_FORM_TOKENS", "500"))
+
+# A throttled tier is skipped for this long
+THROTTLE_COOLDOWN_SECONDS = float(os.getenv("ROUTER_THROTTLE_COOLDOWN", "30"))
+# A tier failing more than this share of its recent calls is skipped
+MAX_ERROR_RATE = float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.5"))
+# Outcomes older than this are forgotten, so a skipped tier gets retried eventually
+ERROR_WINDOW_SECONDS = 60
+MIN_ERROR_SAMPLES = 5
+# Prefer a later healthy tier when the preferred one's p95 is this many times slower
+SLOW_FACTOR = float(os.getenv("ROUTER_SLOW_FACTOR", "2.0"))
+
+
+class TierStats:
+    """Live latency and error picture for one model tier"""
+
+    def __init__(self):
+        self.latency = LatencyWindow()
+        self.outcomes = deque()   # (timestamp, failed)
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.throttles = 0
+
+    def error_rate(self, now: float) -> float:
+        while self.outcomes and now - self.outcomes[0][0] > ERROR_WINDOW_SECONDS:
+            self.outcomes.popleft()
+        if len(self.outcomes) < MIN_ERROR_SAMPLES:
+            return 0.0
+        return sum(failed for _, failed in self.outcomes) / len(self.outcomes)
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until and self.error_rate(now) <= MAX_ERROR_RATE
+
+
+class ModelRouter:
+    """
+    Picks the model tier per call: the call site's configured preference,
+    re-ordered by live health (throttle cooldowns, error rate, p95 latency).
+    Callers try the returned tiers in order and report each outcome.
+    """
+
+    def __init__(self, tiers=TIERS, routes: dict = None):
+        self.tiers = tuple(tiers)
+        self.routes = routes or ROUTES
+        self._stats = {tier: TierStats() for tier in self.tiers}
+        self._lock = threading.Lock()
+
+    def route(self, site: str = None, max_tokens: int = 0) -> list:
+        """Tiers to try for this call, best first; unhealthy tiers go last as a final resort"""
+        site = site or DEFAULT_SITE
+        if site == "generation" and max_tokens >= LONG_FORM_TOKENS:
+            site = "long_form"
+        preferred = [tier for tier in self.routes.get(site, self.routes[DEFAULT_SITE]) if tier in self.tiers]
+
+        now = time.monotonic()
+        with self._lock:
+            healthy = [tier for tier in preferred if self._stats[tier].healthy(now)]
+            unhealthy = [tier for tier in preferred if tier not in healthy]
+            p95 = {tier: self._stats[tier].latency.percentile(0.95) for tier in healthy}
+
+        # Latency-aware: move a clearly faster healthy tier ahead of a slow preferred one
+        if len(healthy) > 1 and p95[healthy[0]] is not None:
+            fastest = min((tier for tier in healthy if p95[tier] is not None), key=lambda tier: p95[tier])
+            if p95[healthy[0]] > SLOW_FACTOR * p95[fastest]:
+                healthy.remove(fastest)
+                healthy.insert(0, fastest)
+        return healthy + unhealthy
+
+    def record(self, tier: str, latency: float = None, throttled: bool = False, failed: bool = False):
+        """Report one call's outcome on tier"""
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats[tier]
+            stats.calls += 1
+            stats.outcomes.append((now, throttled or failed))
+            if throttled:
+                stats.throttles += 1
+                stats.cooldown_until = now + THROTTLE_COOLDOWN_SECONDS
+            if latency is not None and not failed:
+                stats.latency.record(latency)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                tier: {
+                    "calls": stats.calls,
+                    "throttles": stats.throttles,
+                    "error_rate": round(stats.error_rate(now), 3),
+                    "p95": stats.latency.percentile(0.95),
+                    "healthy": stats.healthy(now)
+                }
+                for tier, stats in self._stats.items()
+            }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """Return the process-wide model router"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
@@ -0,0 +1,52 @@
+import os
+import threading
+
+from utils.providers.base import (LLMProvider, Completion, TIERS, request_parts, ProviderError, ProviderThrottled,
+                                  ProviderUnavailable, ProviderTimeout, ProviderRequestError, ProviderAuthError)
+from utils.providers.bedrock import BedrockProvider
+from utils.providers.local import LocalProvider
+
+__all__ = [
+    "LLMProvider", "Completion", "TIERS", "request_parts",
+    "ProviderError", "ProviderThrottled", "ProviderUnavailable", "ProviderTimeout", "ProviderRequestError",
+    "ProviderAuthError", "BedrockProvider", "LocalProvider",
+    "LLM_PROVIDER", "CASSETTE_MODE", "get_provider", "set_provider",
+]
+
+# "bedrock" (default) or "local" (deterministic, no network)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "bedrock")
+# "record" or "replay" wraps the provider in a cassette (utils/providers/cassette.py)
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider(api_key: str = None) -> LLMProvider:
+    """
+    Return the process-wide provider selected by LLM_PROVIDER (recording
+    or replaying through a cassette when CASSETTE_MODE is set).
+    api_key is used for Bedrock (falls back to the BEDROCK_API_KEY env var).
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                if LLM_PROVIDER == "local":
+                    provider = LocalProvider()
+                else:
+                    provider = BedrockProvider(api_key or os.getenv("BEDROCK_API_KEY", ""))
+                if CASSETTE_MODE in ("record", "replay"):
+                    # Imported here: the cassette lives in Auth_Backend, shared with the Resend recorder
+                    from Auth_Backend.cassette import get_cassette
+                    from utils.providers.cassette import CassetteProvider
+                    provider = CassetteProvider(get_cassette(), provider if CASSETTE_MODE == "record" else None)
+                _provider = provider
+    return _provider
+
+
+def set_provider(provider: LLMProvider):
+    """Replace the process-wide provider (benchmarks point the pipeline at a mock server this way)"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
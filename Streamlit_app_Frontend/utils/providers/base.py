@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from typing import NamedTuple
+
+from utils.concurrency import ThrottledError
+
+# -------------------------------
+# REQUESTS AND RESULTS
+# -------------------------------
+# The request every provider accepts is the Nova-style body the app already
+# builds (and caches by):
+#   {"messages": [{"role": "user", "content": [{"text": ...}]}, ...],
+#    "inferenceConfig": {"maxTokens": ..., "temperature": ...}}
+# A trailing assistant message is a prefill the model should continue.
+
+# Model tiers every provider understands; each maps them to its own models
+TIERS = ("micro", "lite", "pro")
+
+
+class Completion(NamedTuple):
+    """One finished reply. usage uses Nova's keys (inputTokens / outputTokens)."""
+    text: str
+    stop_reason: str = None
+    usage: dict = None
+
+
+def request_parts(payload: dict):
+    """(prompt, prefill, max_tokens, temperature) out of a request body"""
+    messages = payload.get("messages", [])
+    prompt = "".join(part.get("text", "") for part in messages[0]["content"]) if messages else ""
+    prefill = None
+    if len(messages) > 1 and messages[-1].get("role") == "assistant":
+        prefill = "".join(part.get("text", "") for part in messages[-1]["content"])
+    config = payload.get("inferenceConfig", {})
+    return prompt, prefill, config.get("maxTokens", 500), config.get("temperature", 0.7)
+
+
+# -------------------------------
+# ERROR TAXONOMY
+# -------------------------------
+# retryable: worth another attempt after backoff (send_with_backoff checks it)
+# throttled: the backend is shedding load (shrinks the concurrency limit)
+
+class ProviderError(Exception):
+    """Base class for every provider failure"""
+    retryable = False
+    throttled = False
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class ProviderThrottled(ProviderError, ThrottledError):
+    """Rate limited or out of capacity (HTTP 429, ThrottlingException)"""
+    retryable = True
+    throttled = True
+
+
+class ProviderUnavailable(ProviderError):
+    """Transient server-side or network failure (5xx, connection reset)"""
+    retryable = True
+
+
+class ProviderTimeout(ProviderError, TimeoutError):
+    """The backend did not answer within the timeout"""
+
+
+class ProviderRequestError(ProviderError):
+    """The request itself was rejected (4xx); retrying won't help"""
+
+
+class ProviderAuthError(ProviderRequestError):
+    """Missing or invalid credentials (401 / 403)"""
+
+
+# -------------------------------
+# PROVIDER INTERFACE
+# -------------------------------
+class LLMProvider:
+    """
+    A text-generation backend. Implementations provide complete() and
+    stream(); the async variants default to running those on a thread.
+    tier is one of TIERS. All failures are raised as ProviderError subclasses.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._usage_lock = threading.Lock()
+        self._usage = {"calls": 0, "inputTokens": 0, "outputTokens": 0}
+
+    def complete(self, payload: dict, tier: str = "micro", timeout=None) -> Completion:
+        raise NotImplementedError
+
+    def stream(self, payload: dict, tier: str = "micro", timeout=None, meta: dict = None):
+        """Yield text fragments; stop_reason and usage are recorded in meta if given"""
+        raise NotImplementedError
+
+    async def acomplete(self, payload: dict, tier: str = "micro", timeout=None) -> Completion:
+        return await asyncio.to_thread(self.complete, payload, tier, timeout)
+
+    async def astream(self, payload: dict, tier: str = "micro", timeout=None, meta: dict = None):
+        fragments = self.stream(payload, tier, timeout, meta)
+        done = object()
+        while True:
+            fragment = await asyncio.to_thread(next, fragments, done)
+            if fragment is done:
+                return
+            yield fragment
+
+    def record_usage(self, usage: dict):
+        """Add one call's token usage to the provider's running totals"""
+        with self._usage_lock:
+            self._usage["calls"] += 1
+            for key in ("inputTokens", "outputTokens"):
+                self._usage[key] += (usage or {}).get(key) or 0
+
+    def usage(self) -> dict:
+        with self._usage_lock:
+            return dict(self._usage)
@@ -0,0 +1,108 @@
+import os
+
+import requests
+
+from utils.bedrock_client import post_json, post_json_stream
+from utils.bedrock_stream import iter_text_deltas, BedrockStreamError
+from utils.concurrency import is_throttle, is_throttle_error
+from utils.providers.base import (LLMProvider, Completion, ProviderError, ProviderThrottled, ProviderUnavailable,
+                                  ProviderTimeout, ProviderRequestError, ProviderAuthError)
+
+# -------------------------------
+# BEDROCK CONFIG
+# -------------------------------
+BEDROCK_ENDPOINT = os.getenv("BEDROCK_ENDPOINT", "https://bedrock-runtime.us-east-1.amazonaws.com")
+
+NOVA_MODELS = {
+    "micro": os.getenv("NOVA_MICRO_MODEL", "amazon.nova-micro-v1:0"),
+    "lite": os.getenv("NOVA_LITE_MODEL", "amazon.nova-lite-v1:0"),
+    "pro": os.getenv("NOVA_PRO_MODEL", "amazon.nova-pro-v1:0"),
+}
+
+# Stream exception events that mean "try again later" rather than "bad request"
+_TRANSIENT_STREAM_ERRORS = {"internalserverexception", "serviceunavailableexception", "modelstreamerrorexception"}
+
+
+def _transport_error(error: Exception) -> ProviderError:
+    """Map a requests / httpx transport failure into the taxonomy"""
+    if isinstance(error, requests.Timeout) or "Timeout" in type(error).__name__:
+        return ProviderTimeout(str(error))
+    return ProviderUnavailable(str(error))
+
+
+def _status_error(response) -> ProviderError:
+    """Map a non-200 Bedrock response into the taxonomy"""
+    try:
+        message = response.json().get("message") or response.text
+    except Exception:
+        # Not JSON, not an object, or a body that failed to decode
+        message = getattr(response, "text", "")
+    status = response.status_code
+    if is_throttle(response):
+        return ProviderThrottled(message or "Bedrock is throttling requests", status)
+    if status in (401, 403):
+        return ProviderAuthError(message or "Bedrock rejected the credentials", status)
+    if status >= 500:
+        return ProviderUnavailable(message or f"Bedrock returned {status}", status)
+    return ProviderRequestError(message or f"Bedrock returned {status}", status)
+
+
+class BedrockProvider(LLMProvider):
+    """Amazon Nova models on Bedrock, via the shared HTTP pool (utils/bedrock_client.py)"""
+
+    name = "bedrock"
+
+    def __init__(self, api_key: str, endpoint: str = BEDROCK_ENDPOINT, models: dict = None):
+        super().__init__()
+        self.endpoint = endpoint
+        self.models = models or NOVA_MODELS
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}"
+        }
+
+    def url(self, tier: str, stream: bool = False) -> str:
+        action = "invoke-with-response-stream" if stream else "invoke"
+        return f"{self.endpoint}/model/{self.models[tier]}/{action}"
+
+    def complete(self, payload: dict, tier: str = "micro", timeout=None) -> Completion:
+        try:
+            response = post_json(self.url(tier), self.headers, payload, timeout)
+        except Exception as e:
+            raise _transport_error(e) from e
+        if response.status_code != 200:
+            raise _status_error(response)
+
+        try:
+            body = response.json()
+        except Exception as e:
+            # A garbled 200 is a service fault: retried and counted by the breaker
+            raise ProviderUnavailable(f"Malformed Bedrock response body: {e}", response.status_code) from e
+        try:
+            text = body["output"]["message"]["content"][0]["text"]
+        except (KeyError, IndexError, TypeError):
+            raise ProviderUnavailable("Unexpected Bedrock response shape")
+        usage = body.get("usage")
+        self.record_usage(usage)
+        return Completion(text, body.get("stopReason"), usage)
+
+    def stream(self, payload: dict, tier: str = "micro", timeout=None, meta: dict = None):
+        meta = meta if meta is not None else {}
+        try:
+            chunks = post_json_stream(self.url(tier, stream=True), self.headers, payload, timeout)
+            for delta in iter_text_deltas(chunks, meta):
+                yield delta
+        except ProviderError:
+            raise
+        except BedrockStreamError as e:
+            if is_throttle_error(e):
+                raise ProviderThrottled(str(e)) from e
+            if e.error_type.lower() in _TRANSIENT_STREAM_ERRORS:
+                raise ProviderUnavailable(str(e)) from e
+            raise ProviderError(str(e)) from e
+        except Exception as e:
+            response = getattr(e, "response", None)
+            if response is not None and getattr(response, "status_code", 200) != 200:
+                raise _status_error(response) from e
+            raise _transport_error(e) from e
+        self.record_usage(meta.get("usage"))
@@ -0,0 +1,59 @@
+from Auth_Backend.cassette import Cassette, CassetteMiss, request_key
+from utils.providers.base import (LLMProvider, Completion, ProviderError, ProviderThrottled, ProviderUnavailable,
+                                  ProviderTimeout, ProviderRequestError, ProviderAuthError)
+
+# Recorded error type -> the exception replay raises, so retries, the breaker
+# and the router react exactly as they did live
+_ERRORS = {cls.__name__: cls for cls in (ProviderError, ProviderThrottled, ProviderUnavailable, ProviderTimeout,
+                                         ProviderRequestError, ProviderAuthError)}
+
+
+def _recorded_error(error: dict) -> ProviderError:
+    cls = _ERRORS.get(error["type"], ProviderUnavailable)
+    return cls(error["message"], error.get("status"))
+
+
+def payload_key(payload: dict, tier: str) -> str:
+    return request_key(payload.get("messages"), payload.get("inferenceConfig"), tier)
+
+
+class CassetteProvider(LLMProvider):
+    """
+    Records every call through another provider to a cassette
+    (Auth_Backend/cassette.py), or replays a cassette without any network.
+    Streams keep their per-chunk timing; speed compresses it on replay.
+    """
+
+    def __init__(self, cassette: Cassette, inner: LLMProvider = None):
+        super().__init__()
+        if cassette.mode == "record" and inner is None:
+            raise ValueError("Recording needs a provider to record from")
+        self.cassette = cassette
+        self.inner = inner
+        self.name = f"{cassette.mode}:{inner.name if inner else 'cassette'}"
+
+    def complete(self, payload: dict, tier: str = "micro", timeout=None) -> Completion:
+        try:
+            response = self.cassette.call(
+                "bedrock", payload_key(payload, tier), {"payload": payload, "tier": tier},
+                lambda: list(self.inner.complete(payload, tier, timeout)),
+                op="complete", make_error=_recorded_error, record_errors=ProviderError
+            )
+        except CassetteMiss as e:
+            # Not an outage: the fixture doesn't cover this request
+            raise ProviderRequestError(str(e)) from e
+        completion = Completion(*response)
+        self.record_usage(completion.usage)
+        return completion
+
+    def stream(self, payload: dict, tier: str = "micro", timeout=None, meta: dict = None):
+        meta = meta if meta is not None else {}
+        try:
+            yield from self.cassette.stream(
+                "bedrock", payload_key(payload, tier), {"payload": payload, "tier": tier},
+                lambda: self.inner.stream(payload, tier, timeout, meta), meta,
+                make_error=_recorded_error, record_errors=ProviderError
+            )
+        except CassetteMiss as e:
+            raise ProviderRequestError(str(e)) from e
+        self.record_usage(meta.get("usage"))
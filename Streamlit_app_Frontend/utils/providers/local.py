@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import random
+import re
+import time
+
+from utils.providers.base import LLMProvider, Completion, request_parts
+
+# -------------------------------
+# LOCAL PROVIDER CONFIG
+# -------------------------------
+# Simulated decode speed; 0 answers instantly (CI), a few dozen mimics a real model
+LOCAL_TOKENS_PER_SECOND = float(os.getenv("LOCAL_PROVIDER_TOKENS_PER_SECOND", "0"))
+# Rough tokens per generated word, used for usage and maxTokens cut-off
+TOKENS_PER_WORD = 1.4
+
+_WORD_TARGET = re.compile(r"approximately (\d+) words")
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]{3,}")
+
+_OPENERS = ["Here's the thing:", "Big news!", "Quick reflection.", "Let me share something.", "Today matters."]
+_FILLER = ["team", "growth", "learning", "impact", "journey", "results", "ideas", "people", "progress",
+           "experience", "focus", "future", "skills", "value", "community", "purpose"]
+_CLOSERS = ["What do you think?", "Let me know in the comments.", "Thanks for reading!", "Onward."]
+
+
+def _tokens(text: str) -> int:
+    return max(1, int(len(text.split()) * TOKENS_PER_WORD))
+
+
+class LocalProvider(LLMProvider):
+    """
+    Deterministic, network-free stand-in for Bedrock. The same request always
+    gets the same reply, built from the prompt's own words, and JSON requests
+    (prompt suggestions, quality scores) get JSON in the expected shape. Meant
+    for air-gapped CI, benchmarks and load tests - not for real content.
+    """
+
+    name = "local"
+
+    def __init__(self, tokens_per_second: float = LOCAL_TOKENS_PER_SECOND):
+        super().__init__()
+        self.tokens_per_second = tokens_per_second
+
+    def _reply(self, prompt: str, prefill: str, max_tokens: int) -> str:
+        seed = prompt + (prefill or "")
+        rng = random.Random(hashlib.sha256(seed.encode("utf-8")).hexdigest())
+
+        if "JSON" in prompt and '"prompt1"' in prompt:
+            idea = prompt.split('"')[1] if prompt.count('"') >= 2 else prompt
+            return json.dumps({
+                "prompt1": {"title": "Share the story", "prompt": f"Tell the story behind: {idea}"},
+                "prompt2": {"title": "Highlight the impact", "prompt": f"Explain the impact and lessons of: {idea}"}
+            })
+        if "JSON" in prompt and "clarity" in prompt:
+            metrics = ["clarity", "engagement", "tone_consistency", "audience_relevance", "professionalism"]
+            return json.dumps({metric: rng.randint(70, 95) for metric in metrics})
+
+        target = _WORD_TARGET.search(prompt)
+        # Without a word target, stay comfortably inside maxTokens
+        words_wanted = int(target.group(1)) if target else int(0.7 * max_tokens / TOKENS_PER_WORD)
+        vocabulary = [w.lower() for w in _WORD.findall(prompt)] + _FILLER
+
+        # A continuation only writes the words still missing
+        words = [] if prefill else rng.choice(_OPENERS).split()
+        if prefill:
+            words_wanted = max(1, words_wanted - len(prefill.split()))
+        while len(words) < words_wanted:
+            sentence = [rng.choice(vocabulary) for _ in range(rng.randint(6, 14))]
+            sentence[0] = sentence[0].capitalize()
+            words.extend(sentence[:-1] + [sentence[-1] + "."])
+        words.extend(rng.choice(_CLOSERS).split())
+        text = " ".join(words)
+        return (" " + text) if prefill else text
+
+    def _generate(self, payload: dict):
+        """(full reply, stop_reason, usage) honouring maxTokens"""
+        prompt, prefill, max_tokens, _ = request_parts(payload)
+        text = self._reply(prompt, prefill, max_tokens)
+        stop_reason = "end_turn"
+        max_words = int(max_tokens / TOKENS_PER_WORD)
+        if len(text.split()) > max_words:
+            text = " ".join(text.split(" ")[:max_words + (1 if text.startswith(" ") else 0)])
+            stop_reason = "max_tokens"
+        usage = {"inputTokens": _tokens(prompt + (prefill or "")), "outputTokens": _tokens(text)}
+        return text, stop_reason, usage
+
+    def _pace(self, tokens: int):
+        if self.tokens_per_second > 0:
+            time.sleep(tokens / self.tokens_per_second)
+
+    def complete(self, payload: dict, tier: str = "micro", timeout=None) -> Completion:
+        text, stop_reason, usage = self._generate(payload)
+        self._pace(usage["outputTokens"])
+        self.record_usage(usage)
+        return Completion(text, stop_reason, usage)
+
+    def stream(self, payload: dict, tier: str = "micro", timeout=None, meta: dict = None):
+        text, stop_reason, usage = self._generate(payload)
+        pieces = re.findall(r"\s*\S+", text)
+        for i in range(0, len(pieces), 4):
+            chunk = "".join(pieces[i:i + 4])
+            self._pace(_tokens(chunk))
+            yield chunk
+        if meta is not None:
+            meta["stop_reason"] = stop_reason
+            meta["usage"] = usage
+        self.record_usage(usage)
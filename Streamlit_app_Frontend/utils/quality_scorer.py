@@ -0,0 +1,207 @@
+import re
+
+import numpy as np
+
+# -------------------------------
+# LOCAL QUALITY SCORER
+# -------------------------------
+# Scores content from surface features without an LLM round trip. Returns
+# the same dict shape as evaluate_content. Feature extraction is per text,
+# the scoring maths runs on a (texts x features) matrix, so scoring a whole
+# history costs about the same per item as scoring one draft.
+
+METRICS = ["clarity", "engagement", "tone_consistency", "audience_relevance", "professionalism"]
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z'’-]*")
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+_HASHTAG = re.compile(r"(?<!\w)#\w+")
+
+# Default length targets when no word_limit is known
+TYPE_TARGET_WORDS = {
+    "LinkedIn Post": 150,
+    "Email": 180,
+    "Blog Post": 300,
+    "Tweet Thread": 120,
+    "Instagram Caption": 100,
+}
+
+# Acceptable hashtag counts per content type
+TYPE_HASHTAG_RANGE = {
+    "LinkedIn Post": (1, 5),
+    "Email": (0, 0),
+    "Blog Post": (0, 2),
+    "Tweet Thread": (1, 4),
+    "Instagram Caption": (3, 15),
+}
+
+CTA_PHRASES = [
+    "let me know", "comment", "share", "follow", "learn more", "reach out", "click",
+    "sign up", "join", "check out", "dm me", "what do you think", "get in touch",
+    "subscribe", "register", "connect with", "reply", "book a"
+]
+
+TONE_WORDS = {
+    "Professional": {"pleased", "delighted", "opportunity", "team", "results", "experience",
+                     "grateful", "honored", "responsible", "delivered", "collaboration"},
+    "Confident": {"proven", "delivered", "led", "achieved", "built", "drove", "exceeded",
+                  "launched", "will", "mastered", "won"},
+    "Friendly": {"hey", "thanks", "love", "happy", "glad", "fun", "awesome", "great",
+                 "excited", "friends", "you"},
+    "Inspirational": {"dream", "inspire", "believe", "journey", "grow", "never", "possible",
+                      "courage", "passion", "future", "purpose", "together"},
+    "Conversational": {"you", "i", "we", "so", "just", "really", "actually", "honestly",
+                       "think", "here's", "let's"},
+}
+
+AUDIENCE_WORDS = {
+    "Recruiters": {"skills", "experience", "role", "team", "led", "results", "project",
+                   "certified", "achievement", "impact", "hiring", "career"},
+    "General Audience": {"you", "people", "everyone", "life", "story", "help", "simple",
+                         "learn", "together", "day"},
+    "Technical Professionals": {"api", "model", "data", "system", "architecture", "code",
+                                "python", "cloud", "latency", "deploy", "framework", "algorithm",
+                                "pipeline", "ai", "ml", "performance"},
+    "Business Leaders": {"growth", "strategy", "roi", "revenue", "market", "customers",
+                         "scale", "efficiency", "value", "leadership", "investment", "cost"},
+}
+
+HEDGE_WORDS = {"maybe", "perhaps", "possibly", "hopefully", "somewhat", "kinda", "sorta", "guess"}
+
+# Column order of the feature matrix
+_FEATURES = [
+    "words", "sentences", "syllables", "sentence_std", "unique_words", "hook", "cta",
+    "hashtags", "exclamations", "questions", "shouting", "hedges", "tone_hits",
+    "audience_hits", "target_words", "hashtag_min", "hashtag_max", "professional_tone"
+]
+_COL = {name: i for i, name in enumerate(_FEATURES)}
+
+
+def _syllables(word: str) -> int:
+    word = word.lower()
+    count = len(_VOWEL_GROUPS.findall(word))
+    if word.endswith("e") and count > 1:
+        count -= 1
+    return max(1, count)
+
+
+def _extract(content: str, content_type: str, tone: str, audience: str, word_limit) -> list:
+    """Per-text feature row (order of _FEATURES)"""
+    content = content or ""
+    words = _WORD.findall(content)
+    lowered = [w.lower() for w in words]
+    sentences = [s for s in _SENTENCE_SPLIT.split(content) if _WORD.search(s)]
+    sentence_lengths = [len(_WORD.findall(s)) for s in sentences] or [0]
+    first = sentences[0].strip() if sentences else ""
+    text_lower = content.lower()
+
+    hashtag_min, hashtag_max = TYPE_HASHTAG_RANGE.get(content_type, (0, 5))
+    target = word_limit or TYPE_TARGET_WORDS.get(content_type, 150)
+    tone_words = TONE_WORDS.get(tone, set())
+    audience_words = AUDIENCE_WORDS.get(audience, set())
+
+    return [
+        len(words),
+        len(sentences),
+        sum(_syllables(w) for w in words),
+        float(np.std(sentence_lengths)),
+        len(set(lowered)),
+        float(first.endswith("?") or "!" in first or any(c.isdigit() for c in first)
+              or "you" in first.lower().split()),
+        float(any(phrase in text_lower for phrase in CTA_PHRASES)),
+        len(_HASHTAG.findall(content)),
+        content.count("!"),
+        content.count("?"),
+        sum(1 for w in words if len(w) > 3 and w.isupper()),
+        sum(1 for w in lowered if w in HEDGE_WORDS),
+        sum(1 for w in lowered if w in tone_words),
+        sum(1 for w in lowered if w in audience_words),
+        target,
+        hashtag_min,
+        hashtag_max,
+        float(tone in ("Professional", "Confident")),
+    ]
+
+
+def _score_matrix(features: np.ndarray) -> np.ndarray:
+    """Vectorized scoring: (n, len(_FEATURES)) -> (n, len(METRICS)) in 0..100"""
+    col = lambda name: features[:, _COL[name]]
+
+    words = np.maximum(col("words"), 1)
+    sentences = np.maximum(col("sentences"), 1)
+    avg_sentence = words / sentences
+
+    # Clarity: Flesch reading ease, penalised for erratic sentence lengths
+    flesch = 206.835 - 1.015 * avg_sentence - 84.6 * (col("syllables") / words)
+    clarity = 50 + np.clip(flesch - 30, 0, 50) * 0.9
+    clarity -= np.clip(col("sentence_std") - 10, 0, None) * 1.5
+
+    # Engagement: lexical diversity (Guiraud's root TTR), hook, CTA, some rhythm
+    diversity = np.clip((col("unique_words") / np.sqrt(words) - 4) / 8, 0, 1)
+    rhythm = ((col("sentence_std") >= 3) & (col("sentence_std") <= 10)).astype(float)
+    engagement = (52 + diversity * 22 + col("hook") * 9 + col("cta") * 8 + rhythm * 5
+                  + np.minimum(col("questions"), 2) * 2)
+
+    # Length fit against word_limit / content-type default (1 at target, falls off either side)
+    ratio = words / np.maximum(col("target_words"), 1)
+    length_fit = np.exp(-(((ratio - 1) / 0.35) ** 2))
+
+    # Hashtag fit for the content type
+    hashtags = col("hashtags")
+    hashtag_miss = (np.clip(col("hashtag_min") - hashtags, 0, None)
+                    + np.clip(hashtags - col("hashtag_max"), 0, None))
+    hashtag_fit = 1 / (1 + hashtag_miss)
+
+    shouting = np.minimum(col("shouting") / words, 0.25)
+    exclaim_rate = col("exclamations") / sentences
+
+    # Tone: density of tone vocabulary, with penalties that depend on the tone
+    tone_density = np.minimum(col("tone_hits") / words * 100, 10)
+    tone_consistency = (68 + tone_density * 2.5 - shouting * 150
+                        - col("professional_tone") * (np.clip(exclaim_rate - 0.3, 0, None) * 25
+                                                      + col("hedges") * 4))
+
+    # Audience: audience vocabulary plus how well the piece fits its format
+    audience_density = np.minimum(col("audience_hits") / words * 100, 10)
+    audience_relevance = 60 + audience_density * 2 + length_fit * 12 + hashtag_fit * 6
+
+    # Professionalism: polish signals
+    professionalism = (80 + length_fit * 8 + hashtag_fit * 6 - shouting * 200
+                       - np.clip(exclaim_rate - 0.3, 0, None) * 20 - col("hedges") * 2)
+
+    scores = np.stack([clarity, engagement, tone_consistency, audience_relevance, professionalism], axis=1)
+    scores = np.clip(np.rint(scores), 0, 100)
+    # Nothing to score -> all zeros
+    scores[col("words") == 0] = 0
+    return scores
+
+
+def score_batch(contents, content_types=None, tones=None, audiences=None, word_limits=None) -> list:
+    """Score many pieces of content at once; returns one score dict per item"""
+    n = len(contents)
+    content_types = content_types or [None] * n
+    tones = tones or [None] * n
+    audiences = audiences or [None] * n
+    word_limits = word_limits or [None] * n
+    if n == 0:
+        return []
+
+    features = np.array(
+        [_extract(c, ct, t, a, wl) for c, ct, t, a, wl in zip(contents, content_types, tones, audiences, word_limits)],
+        dtype=float
+    )
+    scores = _score_matrix(features).astype(int)
+    overall = scores.sum(axis=1) // len(METRICS)
+
+    results = []
+    for row, total in zip(scores, overall):
+        result = {metric: int(value) for metric, value in zip(METRICS, row)}
+        result["overall"] = int(total)
+        results.append(result)
+    return results
+
+
+def score_content(content: str, content_type: str = None, tone: str = None, audience: str = None,
+                  word_limit: int = None) -> dict:
+    """Score a single piece of content (same shape as evaluate_content; purpose plays no part)"""
+    return score_batch([content], [content_type], [tone], [audience], [word_limit])[0]
@@ -0,0 +1,175 @@
+import contextvars
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils.hedging import LatencyWindow
+
+# -------------------------------
+# SCHEDULER CONFIG
+# -------------------------------
+# Lower value = served first. Within a class, users get weighted fair shares.
+PRIORITIES = {
+    "interactive": 0,   # content generation the user is watching
+    "prompts": 1,       # prompt refinement
+    "evaluation": 2,    # quality analysis
+    "background": 3,    # speculative and bulk work
+}
+DEFAULT_PRIORITY = "interactive"
+
+# Per-user budget of requested maxTokens per rolling minute; beyond it a
+# user's calls drop to the background class instead of failing
+USER_TOKENS_PER_MINUTE = int(os.getenv("USER_TOKENS_PER_MINUTE", "30000"))
+QUOTA_WINDOW_SECONDS = 60
+# How often per-user bookkeeping of users gone idle is swept away
+PRUNE_INTERVAL_SECONDS = 60
+
+# Relative share per user (unlisted users get 1.0)
+USER_WEIGHTS = {}
+
+# Class and user of the Bedrock calls made by the current thread / task
+_current = contextvars.ContextVar("bedrock_scheduling", default=(DEFAULT_PRIORITY, ""))
+
+
+@contextmanager
+def scheduling(priority: str, user: str = ""):
+    """Run the enclosed Bedrock calls in the given priority class on behalf of user"""
+    token = _current.set((priority, user or ""))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current_scheduling():
+    """(priority, user) set by the innermost scheduling() block"""
+    return _current.get()
+
+
+class TokenQuota:
+    """Rolling per-user window of requested tokens"""
+
+    def __init__(self, tokens_per_window: int = USER_TOKENS_PER_MINUTE, window: float = QUOTA_WINDOW_SECONDS):
+        self.tokens_per_window = tokens_per_window
+        self.window = window
+        self._spent = {}   # user -> deque of (timestamp, tokens)
+        self._pruned_at = 0.0
+
+    def used(self, user: str, now: float) -> int:
+        spent = self._spent.get(user)
+        if not spent:
+            return 0
+        while spent and now - spent[0][0] > self.window:
+            spent.popleft()
+        return sum(tokens for _, tokens in spent)
+
+    def prune(self, now: float):
+        """Forget users with nothing left in the window"""
+        for user in [u for u, spent in self._spent.items() if not spent or now - spent[-1][0] > self.window]:
+            del self._spent[user]
+        self._pruned_at = now
+
+    def charge(self, user: str, tokens: int, now: float) -> bool:
+        """Record tokens for user; False if that puts them over quota"""
+        if now - self._pruned_at >= PRUNE_INTERVAL_SECONDS:
+            self.prune(now)
+        over = self.used(user, now) + tokens > self.tokens_per_window
+        self._spent.setdefault(user, deque()).append((now, tokens))
+        return not over
+
+
+class FairQueue:
+    """
+    Strict priority between classes, start-time weighted fair queuing
+    between users inside a class: each request is stamped with a virtual
+    finish time of max(class clock, user's last finish) + cost / weight,
+    and the smallest stamp goes next. Not thread-safe: the limiter that
+    owns it serialises access under its own lock.
+    """
+
+    def __init__(self, quota: TokenQuota = None):
+        self.quota = quota or TokenQuota()
+        self._heap = []
+        self._removed = set()
+        self._seq = itertools.count()
+        self._clock = {}         # priority -> virtual time
+        self._last_finish = {}   # (priority, user) -> (virtual finish, last enqueued at)
+        self._depth = {}         # priority name -> waiting requests
+        self._waits = {name: LatencyWindow() for name in PRIORITIES}
+        self._granted = {name: 0 for name in PRIORITIES}
+        self._pruned_at = time.monotonic()
+        self.demoted = 0
+
+    def prune(self, now: float):
+        """
+        Forget users whose last finish the class clock has passed (their next
+        request starts at the clock either way) or who have been idle for a
+        whole PRUNE_INTERVAL_SECONDS; a returning user just starts afresh.
+        """
+        stale = [
+            key for key, (finish, seen) in self._last_finish.items()
+            if finish <= self._clock.get(key[0], 0.0) or now - seen >= PRUNE_INTERVAL_SECONDS
+        ]
+        for key in stale:
+            del self._last_finish[key]
+        self._pruned_at = now
+
+    def enqueue(self, priority: str, user: str, cost: int):
+        """Add a waiting request; returns its ticket"""
+        now = time.monotonic()
+        if now - self._pruned_at >= PRUNE_INTERVAL_SECONDS:
+            self.prune(now)
+        user = user or "anonymous"
+        priority = priority if priority in PRIORITIES else DEFAULT_PRIORITY
+        if not self.quota.charge(user, cost, now) and PRIORITIES[priority] < PRIORITIES["background"]:
+            priority = "background"
+            self.demoted += 1
+
+        level = PRIORITIES[priority]
+        start = max(self._clock.get(level, 0.0), self._last_finish.get((level, user), (0.0, now))[0])
+        finish = start + max(cost, 1) / USER_WEIGHTS.get(user, 1.0)
+        self._last_finish[(level, user)] = (finish, now)
+
+        ticket = (level, finish, next(self._seq), start, priority, now)
+        heapq.heappush(self._heap, ticket)
+        self._depth[priority] = self._depth.get(priority, 0) + 1
+        return ticket
+
+    def head(self):
+        while self._heap and self._heap[0] in self._removed:
+            self._removed.discard(heapq.heappop(self._heap))
+        return self._heap[0] if self._heap else None
+
+    def grant(self, ticket):
+        """Take ticket (the current head) off the queue"""
+        heapq.heappop(self._heap)
+        level, _, _, start, priority, enqueued = ticket
+        self._clock[level] = max(self._clock.get(level, 0.0), start)
+        self._depth[priority] -= 1
+        self._granted[priority] += 1
+        self._waits[priority].record(time.monotonic() - enqueued)
+
+    def cancel(self, ticket):
+        """Drop a request that gave up waiting"""
+        self._removed.add(ticket)
+        self._depth[ticket[4]] -= 1
+
+    def __len__(self):
+        return sum(self._depth.values())
+
+    def stats(self) -> dict:
+        return {
+            "demoted": self.demoted,
+            "classes": {
+                name: {
+                    "queued": self._depth.get(name, 0),
+                    "granted": self._granted[name],
+                    "wait_p50": self._waits[name].percentile(0.5),
+                    "wait_p95": self._waits[name].percentile(0.95)
+                }
+                for name in PRIORITIES
+            }
+        }
@@ -0,0 +1,82 @@
+import threading
+
+# -------------------------------
+# REQUEST COALESCING
+# -------------------------------
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class Group:
+    """
+    Coalesce concurrent calls that share a key: the first caller runs fn,
+    everyone who arrives while it is in flight waits for and shares its
+    result (or exception). Nothing is remembered once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: str, fn, timeout: float = None):
+        """
+        Run fn for key, or wait for the identical call already in flight.
+        timeout bounds how long a waiter blocks (TimeoutError); it does not
+        interrupt the leader.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError("Timed out waiting for an identical in-flight call")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._calls)
+        return {"executed": self.executed, "shared": self.shared, "in_flight": in_flight}
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_group(name: str) -> Group:
+    """Return the process-wide group for a call site (shared by all sessions)"""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = Group()
+        return _groups[name]
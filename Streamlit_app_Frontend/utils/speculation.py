@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.scheduler import scheduling
+
+# -------------------------------
+# SPECULATION CONFIG
+# -------------------------------
+SPECULATIVE_GENERATION = os.getenv("SPECULATIVE_GENERATION", "1") == "1"
+# Never more than this many speculative calls in flight per process
+MAX_IN_FLIGHT = int(os.getenv("SPECULATION_MAX_IN_FLIGHT", "4"))
+# Cost cap: speculative maxTokens allowed per rolling minute, process-wide
+TOKENS_PER_MINUTE = int(os.getenv("SPECULATION_TOKENS_PER_MINUTE", "20000"))
+# Back off when guesses are mostly wrong: below this hit rate (after a few
+# outcomes) only every other speculation is allowed
+MIN_HIT_RATE = float(os.getenv("SPECULATION_MIN_HIT_RATE", "0.3"))
+MIN_OUTCOMES = 10
+
+
+class Speculator:
+    """
+    Runs likely-needed generations in the background before the user asks.
+    Results land in the response cache (and in-flight calls are joined via
+    singleflight), so a matching real request is served without waiting.
+    Wrong guesses can't be recalled once sent, so they are bounded by the
+    in-flight cap, the token rate cap and the hit-rate throttle.
+    """
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, tokens_per_minute: int = TOKENS_PER_MINUTE):
+        self.max_in_flight = max_in_flight
+        self.tokens_per_minute = tokens_per_minute
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._spent = deque()   # (timestamp, tokens)
+        self.started = 0
+        self.used = 0
+        self.dropped = 0
+        self.skipped = 0
+        self._attempts = 0
+
+    def _tokens_last_minute(self, now: float) -> int:
+        while self._spent and now - self._spent[0][0] > 60:
+            self._spent.popleft()
+        return sum(tokens for _, tokens in self._spent)
+
+    def _hit_rate_ok(self) -> bool:
+        outcomes = self.used + self.dropped
+        if outcomes < MIN_OUTCOMES or self.used / outcomes >= MIN_HIT_RATE:
+            return True
+        return self._attempts % 2 == 0
+
+    def try_start(self, key: str, fn, est_tokens: int, user: str = "") -> bool:
+        """
+        Run fn() in the background under the cost caps; False if skipped.
+        Its Bedrock calls queue behind all interactive work (background class).
+        """
+        now = time.monotonic()
+        with self._lock:
+            if key in self._in_flight:
+                return True
+            self._attempts += 1
+            if (len(self._in_flight) >= self.max_in_flight
+                    or self._tokens_last_minute(now) + est_tokens > self.tokens_per_minute
+                    or not self._hit_rate_ok()):
+                self.skipped += 1
+                return False
+            self._in_flight.add(key)
+            self._spent.append((now, est_tokens))
+            self.started += 1
+
+        def run():
+            try:
+                with scheduling("background", user):
+                    fn()
+            except Exception as e:
+                print(f"Speculative generation failed: {e}")
+            finally:
+                with self._lock:
+                    self._in_flight.discard(key)
+
+        self._executor.submit(run)
+        return True
+
+    def record_outcome(self, used: bool):
+        """Whether the user's real request matched the speculation"""
+        with self._lock:
+            if used:
+                self.used += 1
+            else:
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            outcomes = self.used + self.dropped
+            return {
+                "started": self.started,
+                "used": self.used,
+                "dropped": self.dropped,
+                "skipped": self.skipped,
+                "in_flight": len(self._in_flight),
+                "hit_rate": round(self.used / outcomes, 3) if outcomes else 0.0,
+                "tokens_last_minute": self._tokens_last_minute(time.monotonic())
+            }
+
+
+_speculator = None
+_speculator_lock = threading.Lock()
+
+
+def get_speculator() -> Speculator:
+    """Return the process-wide speculator"""
+    global _speculator
+    if _speculator is None:
+        with _speculator_lock:
+            if _speculator is None:
+                _speculator = Speculator()
+    return _speculator
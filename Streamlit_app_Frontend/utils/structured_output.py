@@ -0,0 +1,202 @@
+import json
+import re
+import threading
+
+# -------------------------------
+# TOLERANT JSON EXTRACTION
+# -------------------------------
+# Models wrap JSON in prose or ```json fences, leave trailing commas, use
+# smart or single quotes. Recover what we can locally before paying for a
+# (cheap) repair call, and never a full regeneration.
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"', "‘": "'", "’": "'"})
+_UNQUOTED_KEY = re.compile(r"([{,]\s*)([A-Za-z_][A-Za-z0-9_]*)\s*:")
+
+
+def find_json_object(text: str):
+    """
+    Return the first balanced {...} substring, ignoring braces inside strings.
+    If the object is cut off, the missing closing brackets are appended.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    stack = []
+    in_string = None
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == in_string:
+                in_string = None
+            continue
+        if ch in "\"'" and (ch == '"' or text[i - 1] in "{[,: \n\t"):
+            in_string = ch
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return text[start:i + 1]
+
+    # Truncated output: close what is still open
+    tail = text[start:].rstrip().rstrip(",")
+    if in_string:
+        tail += in_string
+    return tail + "".join(reversed(stack))
+
+
+def _requote_single(text: str) -> str:
+    """Turn 'single-quoted' strings into JSON strings, leaving "double-quoted" ones alone"""
+    out = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch in "\"'":
+            j = i + 1
+            while j < len(text) and text[j] != ch:
+                j += 2 if text[j] == "\\" else 1
+            body = text[i + 1:j]
+            out.append(json.dumps(body) if ch == "'" else f'"{body}"')
+            i = j + 1
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _repairs(candidate: str):
+    """Progressively more aggressive local fixes"""
+    yield candidate
+    fixed = _TRAILING_COMMA.sub(r"\1", candidate.translate(_SMART_QUOTES))
+    yield fixed
+    fixed = _UNQUOTED_KEY.sub(r'\1"\2":', fixed)
+    yield fixed
+    yield _requote_single(fixed)
+
+
+def extract_json(text: str):
+    """Parse the first JSON object in model output, or return None"""
+    if not text:
+        return None
+    if "```" in text:
+        fenced = re.search(r"```(?:json)?\s*(.*?)(?:```|$)", text, re.DOTALL)
+        if fenced and "{" in fenced.group(1):
+            text = fenced.group(1)
+
+    candidate = find_json_object(text)
+    if candidate is None:
+        return None
+    for attempt in _repairs(candidate):
+        try:
+            value = json.loads(attempt)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+# -------------------------------
+# SCHEMA VALIDATION
+# -------------------------------
+# A schema is a dict of key -> type, tuple of types, or nested schema dict.
+
+class SchemaError(ValueError):
+    pass
+
+
+def validate(value, schema: dict, path: str = "$"):
+    """Check value against schema; returns value (numeric strings are coerced)"""
+    if not isinstance(value, dict):
+        raise SchemaError(f"{path} is not an object")
+    for key, expected in schema.items():
+        if key not in value:
+            raise SchemaError(f"{path}.{key} is missing")
+        item = value[key]
+        if isinstance(expected, dict):
+            validate(item, expected, f"{path}.{key}")
+            continue
+        types = expected if isinstance(expected, tuple) else (expected,)
+        if (int in types or float in types) and isinstance(item, str):
+            try:
+                item = value[key] = float(item) if "." in item else int(item)
+            except ValueError:
+                pass
+        if not isinstance(item, types) or isinstance(item, bool):
+            raise SchemaError(f"{path}.{key} has the wrong type")
+    return value
+
+
+# -------------------------------
+# PARSE-FAILURE TRACKING
+# -------------------------------
+class ParseStats:
+    """Per-call-site counters for structured-output parsing"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites = {}
+
+    def record(self, site: str, outcome: str):
+        with self._lock:
+            counts = self._sites.setdefault(
+                site, {"attempts": 0, "parsed": 0, "repair_calls": 0, "repaired": 0, "failed": 0}
+            )
+            counts[outcome] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {}
+            for site, counts in self._sites.items():
+                attempts = counts["attempts"]
+                result[site] = dict(counts, failure_rate=round(counts["failed"] / attempts, 3) if attempts else 0.0)
+            return result
+
+
+parse_stats = ParseStats()
+
+
+def repair_prompt(raw: str, example: str) -> str:
+    return f"""The following text was supposed to be a JSON object but is not valid.
+Rewrite it as valid JSON with exactly this structure:
+{example}
+
+Text:
+{raw}
+
+Only return the JSON, no other text."""
+
+
+def parse_structured(raw: str, schema: dict, site: str, repair=None, example: str = ""):
+    """
+    Extract and validate JSON from model output. If local recovery fails and
+    repair is given, make one repair call: repair(prompt) -> text or None.
+    Returns the validated dict, or None.
+    """
+    parse_stats.record(site, "attempts")
+    try:
+        value = validate(extract_json(raw), schema)
+        parse_stats.record(site, "parsed")
+        return value
+    except SchemaError:
+        pass
+
+    if repair is not None and raw:
+        parse_stats.record(site, "repair_calls")
+        try:
+            value = validate(extract_json(repair(repair_prompt(raw, example))), schema)
+            parse_stats.record(site, "repaired")
+            return value
+        except SchemaError:
+            pass
+
+    parse_stats.record(site, "failed")
+    return None
@@ -0,0 +1,75 @@
+import re
+
+# -------------------------------
+# MODEL OUTPUT CLEANING
+# -------------------------------
+def clean_model_output(text: str) -> str:
+    text = re.sub(r"</?[^>]+>", "", text)
+    text = text.replace("<", "").replace(">", "")
+    return text.strip()
+
+
+class StreamingCleaner:
+    """
+    Incremental version of clean_model_output for streamed text.
+
+    Anything from a "<" up to the next ">" is a tag and is dropped, even when
+    the tag is split across chunks; text after an unclosed "<" is held back
+    until we know whether it closes. Joining every value returned by feed()
+    and finish() gives the same result as clean_model_output(full_text).
+    """
+
+    def __init__(self):
+        self._pending = ""       # text starting at an unclosed "<"
+        self._whitespace = ""    # trailing whitespace not yet emitted
+        self._started = False    # leading whitespace is stripped
+
+    def _emit(self, text: str) -> str:
+        text = text.replace(">", "")
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+
+        stripped = text.rstrip()
+        if not stripped:
+            self._whitespace += text
+            return ""
+
+        out = self._whitespace + stripped
+        self._whitespace = text[len(stripped):]
+        return out
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk and return the newly cleaned text that is safe to show"""
+        text = self._pending + chunk
+        self._pending = ""
+        out = []
+
+        while text:
+            start = text.find("<")
+            if start == -1:
+                out.append(self._emit(text))
+                break
+
+            out.append(self._emit(text[:start]))
+            if text[start + 1:start + 2] == ">":
+                # "<>" is not a tag; the brackets are dropped on their own
+                text = text[start + 2:]
+                continue
+            end = text.find(">", start + 2)
+            if end == -1:
+                self._pending = text[start:]
+                break
+            text = text[end + 1:]
+
+        return "".join(out)
+
+    def finish(self) -> str:
+        """Flush held-back text once the stream has ended"""
+        text = self._pending.replace("<", "")
+        self._pending = ""
+        out = self._emit(text)
+        self._whitespace = ""
+        return out
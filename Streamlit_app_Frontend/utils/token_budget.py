@@ -0,0 +1,100 @@
+import math
+import os
+import threading
+
+# -------------------------------
+# TOKEN BUDGET CONFIG
+# -------------------------------
+# Starting tokens-per-word estimates before any usage has been observed.
+# Hashtags, emoji and list formatting push short-form content higher.
+PRIOR_TOKENS_PER_WORD = {
+    "LinkedIn Post": 1.45,
+    "Email": 1.35,
+    "Blog Post": 1.4,
+    "Tweet Thread": 1.6,
+    "Instagram Caption": 1.7,
+}
+DEFAULT_TOKENS_PER_WORD = 1.45
+
+# Headroom over the estimate: models overshoot "approximately N words"
+SAFETY_MARGIN = float(os.getenv("TOKEN_BUDGET_MARGIN", "0.35"))
+# Fixed allowance for titles, sign-offs and formatting
+OVERHEAD_TOKENS = 40
+MAX_OUTPUT_TOKENS = int(os.getenv("TOKEN_BUDGET_MAX_TOKENS", "2048"))
+MIN_CONTINUATION_TOKENS = 64
+# Budgets are rounded up to a multiple of this. maxTokens is part of the
+# response cache key and the job key, so it must not drift with every
+# observation of the moving average.
+TOKEN_BUCKET = int(os.getenv("TOKEN_BUDGET_BUCKET", "64"))
+
+# Weight of each new observation in the moving average
+EWMA_ALPHA = 0.2
+
+TRUNCATED_STOP_REASONS = {"max_tokens", "length"}
+
+
+def is_truncated(stop_reason) -> bool:
+    """Whether Bedrock stopped because it ran out of maxTokens"""
+    return stop_reason in TRUNCATED_STOP_REASONS
+
+
+def bucketed(tokens: int) -> int:
+    """tokens rounded up to the next TOKEN_BUCKET, capped at MAX_OUTPUT_TOKENS"""
+    return min(MAX_OUTPUT_TOKENS, int(math.ceil(tokens / TOKEN_BUCKET)) * TOKEN_BUCKET)
+
+
+class TokenBudget:
+    """Learns tokens-per-word per content type from Bedrock's usage.outputTokens"""
+
+    def __init__(self):
+        self._ratios = dict(PRIOR_TOKENS_PER_WORD)
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def tokens_per_word(self, content_type: str) -> float:
+        with self._lock:
+            return self._ratios.get(content_type, DEFAULT_TOKENS_PER_WORD)
+
+    def observe(self, content_type: str, output_text: str, usage: dict):
+        """Fold one completed call's usage into the estimate for its content type"""
+        words = len((output_text or "").split())
+        output_tokens = (usage or {}).get("outputTokens")
+        if not words or not output_tokens:
+            return
+        ratio = output_tokens / words
+        with self._lock:
+            current = self._ratios.get(content_type, DEFAULT_TOKENS_PER_WORD)
+            self._ratios[content_type] = (1 - EWMA_ALPHA) * current + EWMA_ALPHA * ratio
+            self._samples[content_type] = self._samples.get(content_type, 0) + 1
+
+    def max_tokens_for(self, content_type: str, word_limit: int) -> int:
+        """maxTokens for a piece of roughly word_limit words, with margin"""
+        estimate = word_limit * self.tokens_per_word(content_type) * (1 + SAFETY_MARGIN)
+        return bucketed(int(math.ceil(estimate)) + OVERHEAD_TOKENS)
+
+    def continuation_tokens(self, content_type: str, word_limit: int, text_so_far: str) -> int:
+        """maxTokens for finishing a truncated piece: only the words still missing"""
+        missing_words = max(0, word_limit - len(text_so_far.split()))
+        estimate = missing_words * self.tokens_per_word(content_type) * (1 + SAFETY_MARGIN)
+        return bucketed(max(MIN_CONTINUATION_TOKENS, int(math.ceil(estimate)) + OVERHEAD_TOKENS))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                content_type: {"tokens_per_word": round(ratio, 3), "samples": self._samples.get(content_type, 0)}
+                for content_type, ratio in self._ratios.items()
+            }
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_token_budget() -> TokenBudget:
+    """Return the process-wide token budget estimator"""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = TokenBudget()
+    return _budget